@@ -0,0 +1,63 @@
+"""add_organizations_users_count
+
+Revision ID: 6e54d44cbc45
+Revises: d2eef28bb4c0
+Create Date: 2026-10-14 11:18:06.442791
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e54d44cbc45'
+down_revision = 'd2eef28bb4c0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'organizations',
+        sa.Column('users_count', sa.Integer(), server_default=sa.text('0'), nullable=False)
+    )
+
+    # Keep organizations.users_count in step with users inserted, deleted or moved between organizations
+    op.execute("""
+        CREATE OR REPLACE FUNCTION organizations_users_count_trigger() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.organization_id IS NOT NULL THEN
+                UPDATE organizations SET users_count = users_count - 1 WHERE id = OLD.organization_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.organization_id IS NOT NULL THEN
+                UPDATE organizations SET users_count = users_count + 1 WHERE id = NEW.organization_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER users_organization_count
+        AFTER INSERT OR DELETE OR UPDATE OF organization_id ON users
+        FOR EACH ROW
+        EXECUTE FUNCTION organizations_users_count_trigger();
+    """)
+
+    # Backfill counts for existing users
+    op.execute("""
+        UPDATE organizations o
+        SET users_count = c.cnt
+        FROM (
+            SELECT organization_id, count(*) AS cnt
+            FROM users
+            WHERE organization_id IS NOT NULL
+            GROUP BY organization_id
+        ) c
+        WHERE o.id = c.organization_id;
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS users_organization_count ON users;")
+    op.execute("DROP FUNCTION IF EXISTS organizations_users_count_trigger();")
+    op.drop_column('organizations', 'users_count')
@@ -0,0 +1,33 @@
+"""add_sessions_lookup_indexes
+
+Revision ID: 75cf5ef67559
+Revises: 6e54d44cbc45
+Create Date: 2026-10-14 12:02:33.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '75cf5ef67559'
+down_revision = '6e54d44cbc45'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_sessions_user_active',
+            'sessions',
+            ['user_id', 'is_revoked'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_sessions_user_active', table_name='sessions', postgresql_concurrently=True)
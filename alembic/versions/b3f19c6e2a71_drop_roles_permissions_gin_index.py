@@ -0,0 +1,39 @@
+"""drop_roles_permissions_gin_index
+
+Revision ID: b3f19c6e2a71
+Revises: d45afdcbef52
+Create Date: 2026-10-14 16:12:08.441972
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3f19c6e2a71'
+down_revision = 'd45afdcbef52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # No query filters roles by permissions yet; the index only cost writes
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_roles_permissions_gin',
+            table_name='roles',
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_roles_permissions_gin',
+            'roles',
+            ['permissions'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True
+        )
@@ -0,0 +1,37 @@
+"""add_users_org_active_index
+
+Revision ID: d095cb1e1217
+Revises: d7ca05538a26
+Create Date: 2026-10-14 09:12:41.503218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd095cb1e1217'
+down_revision = 'd7ca05538a26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_org_active',
+            'users',
+            ['organization_id', 'is_active'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_users_org_active',
+            table_name='users',
+            postgresql_concurrently=True
+        )
@@ -0,0 +1,38 @@
+"""add_roles_permissions_gin_index
+
+Revision ID: d2eef28bb4c0
+Revises: daa16a089773
+Create Date: 2026-10-14 10:41:52.917340
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2eef28bb4c0'
+down_revision = 'daa16a089773'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_roles_permissions_gin',
+            'roles',
+            ['permissions'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_roles_permissions_gin',
+            table_name='roles',
+            postgresql_concurrently=True
+        )
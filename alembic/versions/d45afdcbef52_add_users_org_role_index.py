@@ -0,0 +1,33 @@
+"""add_users_org_role_index
+
+Revision ID: d45afdcbef52
+Revises: 75cf5ef67559
+Create Date: 2026-10-14 13:41:07.562918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd45afdcbef52'
+down_revision = '75cf5ef67559'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_org_role',
+            'users',
+            ['organization_id', 'role_id'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_org_role', table_name='users', postgresql_concurrently=True)
@@ -0,0 +1,49 @@
+"""server_defaults_and_jsonb_permissions
+
+Revision ID: daa16a089773
+Revises: d095cb1e1217
+Create Date: 2026-10-14 10:03:17.284615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'daa16a089773'
+down_revision = 'd095cb1e1217'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column('organizations', 'country', server_default='India')
+    op.alter_column('organizations', 'is_active', server_default=sa.text('true'))
+    op.alter_column('users', 'is_active', server_default=sa.text('true'))
+    op.alter_column('users', 'is_verified', server_default=sa.text('false'))
+    op.alter_column('sessions', 'is_revoked', server_default=sa.text('false'))
+    op.alter_column('roles', 'is_active', server_default=sa.text('true'))
+    op.alter_column(
+        'roles',
+        'permissions',
+        type_=postgresql.JSONB(astext_type=sa.Text()),
+        postgresql_using='permissions::jsonb',
+        server_default=sa.text("'{}'::jsonb")
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        'roles',
+        'permissions',
+        type_=sa.JSON(),
+        postgresql_using='permissions::json',
+        server_default=None
+    )
+    op.alter_column('roles', 'is_active', server_default=None)
+    op.alter_column('sessions', 'is_revoked', server_default=None)
+    op.alter_column('users', 'is_verified', server_default=None)
+    op.alter_column('users', 'is_active', server_default=None)
+    op.alter_column('organizations', 'is_active', server_default=None)
+    op.alter_column('organizations', 'country', server_default=None)
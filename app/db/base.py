@@ -1,3 +1,8 @@
 from sqlalchemy.orm import declarative_base
+from app.db.session import get_settings
 
 Base = declarative_base()
+
+# Loader strategy for collections that request paths should never lazy-load.
+# In development an accidental lazy load raises instead of silently issuing an N+1 query.
+AUDITED_LAZY = "raise_on_sql" if get_settings().environment == "development" else "select"
@@ -1,7 +1,13 @@
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from app.models.role import Role
 from app.models.user import User
+from app.db.session import get_settings
 from app.utils.security import get_password_hash
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 def init_db(db: Session) -> None:
@@ -71,29 +77,39 @@ def init_db(db: Session) -> None:
         }
     ]
 
-    for role_data in default_roles:
-        role = db.query(Role).filter(Role.name == role_data["name"]).first()
-        if not role:
-            role = Role(**role_data)
-            db.add(role)
-
+    # Seed all roles in one round-trip; existing names are left untouched
+    db.execute(
+        pg_insert(Role)
+        .values(default_roles)
+        .on_conflict_do_nothing(index_elements=["name"])
+    )
     db.commit()
 
     # Create default system admin user if doesn't exist
     admin_email = "admin@vyon.com"
-    admin = db.query(User).filter(User.email == admin_email).first()
-    if not admin:
-        system_admin_role = db.query(Role).filter(Role.name == "system_admin").first()
-        admin = User(
+    admin_exists = db.execute(
+        select(select(User.id).where(User.email == admin_email).exists())
+    ).scalar()
+    if admin_exists:
+        return
+
+    # Only hash once we know the admin is missing; prefer a pre-computed hash when provided
+    admin_hash = get_settings().admin_bootstrap_hash or get_password_hash("admin123")  # Change in production!
+
+    result = db.execute(
+        pg_insert(User)
+        .values(
             email=admin_email,
             username="sysadmin",
-            hashed_password=get_password_hash("admin123"),  # Change in production!
+            hashed_password=admin_hash,
             full_name="System Administrator",
             is_active=True,
             is_verified=True,
-            role_id=system_admin_role.id,
+            role_id=select(Role.id).where(Role.name == "system_admin").scalar_subquery(),
             organization_id=None  # System admin is not tied to a specific organization
         )
-        db.add(admin)
-        db.commit()
-        print(f"✅ Created default system admin user: {admin_email} / admin123")
+        .on_conflict_do_nothing(index_elements=["email"])
+    )
+    db.commit()
+    if result.rowcount:
+        logger.info("Created default system admin user: %s", admin_email)
@@ -1,51 +1,157 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-import os
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlalchemy.orm import Session
 from app.routers import auth, users, roles, organizations
-from app.db.session import SessionLocal
+from app.services import auth_service
+from app.db.session import engine, SessionLocal, get_settings
 from app.db.init_db import init_db
+from app.services.role_cache import load_roles
+from app.utils import auth_cache
+from logging.handlers import QueueHandler, QueueListener
+from queue import Queue
+import asyncio
+import atexit
+import logging
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+def configure_logging() -> None:
+    """
+    Send application log records through a queue so formatting and stream
+    writes happen on a listener thread instead of the calling thread.
+    """
+    app_logger = logging.getLogger("app")
+    if app_logger.handlers:
+        return
+
+    log_queue = Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    app_logger.addHandler(QueueHandler(log_queue))
+    # Debug traces (e.g. login/session creation) are development-only
+    app_logger.setLevel(logging.DEBUG if settings.environment == "development" else logging.INFO)
+
+
+configure_logging()
 
 # Get environment
-environment = os.getenv("ENVIRONMENT", "development")
+environment = settings.environment
 
 app = FastAPI(
     title="Authentication Service API",
     description="Microservice for managing authentication and authorization for VYON platform",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS configuration - restrict origins in production
 if environment == "production":
-    allowed_origins = os.getenv(
-        "ALLOWED_ORIGINS",
-        ""
-    ).split(",") if os.getenv("ALLOWED_ORIGINS") else []
-    # Remove empty strings
-    allowed_origins = [origin.strip() for origin in allowed_origins if origin.strip()]
+    allowed_origins = settings.allowed_origins
 else:
     # Development: allow all origins
     allowed_origins = ["*"]
 
+
+class FrozenOriginsCORSMiddleware(CORSMiddleware):
+    """CORSMiddleware that checks explicit origins against a frozenset instead of a list."""
+
+    def __init__(self, app, **kwargs):
+        super().__init__(app, **kwargs)
+        self.allow_origins = frozenset(self.allow_origins)
+
+
+# Wildcard origins with credentials forces per-request origin echoing (and is invalid per spec)
+allow_all_origins = allowed_origins == ["*"]
+
 app.add_middleware(
-    CORSMiddleware,
+    FrozenOriginsCORSMiddleware,
     allow_origins=allowed_origins,
-    allow_credentials=True,
+    allow_credentials=not allow_all_origins,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Arbitrary key for the Postgres advisory lock that serializes seeding across workers
+SEED_LOCK_KEY = 915237
+
+
+def _initialize_database() -> bool:
+    """
+    Seed default roles and admin user unless the roles table is already populated.
+    Returns True if seeding ran.
+    """
+    with engine.connect() as conn:
+        # Fast path: a single cheap probe once the database has been seeded
+        if conn.execute(text("SELECT 1 FROM roles LIMIT 1")).first():
+            return False
+
+        # Only one worker seeds at a time; init_db is idempotent for the others
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": SEED_LOCK_KEY})
+        conn.commit()
+        try:
+            db = Session(bind=conn)
+            try:
+                init_db(db)
+            finally:
+                db.close()
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SEED_LOCK_KEY})
+            conn.commit()
+    return True
+
+
+def _purge_stale_sessions() -> int:
+    """Delete unusable session rows so the sessions table doesn't grow unbounded."""
+    db = SessionLocal()
+    try:
+        return auth_service.purge_stale_sessions(db)
+    finally:
+        db.close()
+
+
+async def _session_cleanup_loop() -> None:
+    """Periodically purge stale sessions in the threadpool."""
+    while True:
+        await asyncio.sleep(settings.session_cleanup_interval_seconds)
+        try:
+            deleted = await run_in_threadpool(_purge_stale_sessions)
+            if deleted:
+                logger.info("Purged %d stale sessions", deleted)
+        except Exception as e:
+            logger.error("Error purging stale sessions: %s", e)
+
+
 # Initialize database on startup
 @app.on_event("startup")
-def startup_event():
+async def startup_event():
     """Initialize database with default roles on startup"""
-    db = SessionLocal()
     try:
-        init_db(db)
-        print("✅ Database initialized with default roles")
+        # Run the blocking DB work off the event loop
+        if await run_in_threadpool(_initialize_database):
+            logger.info("Database initialized with default roles")
+        await run_in_threadpool(load_roles)
     except Exception as e:
-        print(f"❌ Error initializing database: {e}")
-    finally:
-        db.close()
+        logger.error("Error initializing database: %s", e)
+    
+    auth_cache.start_broadcast()
+    app.state.session_cleanup_task = asyncio.create_task(_session_cleanup_loop())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background maintenance tasks"""
+    app.state.session_cleanup_task.cancel()
+    auth_cache.stop_broadcast()
 
 # Include routers
 app.include_router(auth.router)
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.db.base import Base
+from app.db.base import Base, AUDITED_LAZY
 
 
 class Organization(Base):
@@ -13,14 +13,15 @@ class Organization(Base):
     address = Column(Text)
     city = Column(String(100))
     state = Column(String(100))
-    country = Column(String(100), default="India")
+    country = Column(String(100), server_default="India")
     postal_code = Column(String(20))
     phone = Column(String(20))
     email = Column(String(255), nullable=False)  # Required for admin account and notifications
     website = Column(String(255))
-    is_active = Column(Boolean, default=True, nullable=False, index=True)
+    is_active = Column(Boolean, server_default=text("true"), nullable=False, index=True)
+    users_count = Column(Integer, server_default=text("0"), nullable=False)  # Maintained by a DB trigger on users
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     # Relationships
-    users = relationship("User", back_populates="organization")
+    users = relationship("User", back_populates="organization", lazy=AUDITED_LAZY)
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
-from app.db.base import Base
+from app.db.base import Base, AUDITED_LAZY
 
 
 class Role(Base):
@@ -9,8 +10,8 @@ class Role(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(50), unique=True, nullable=False, index=True)
     description = Column(String(255))
-    permissions = Column(JSON, nullable=False, default=dict)
-    is_active = Column(Boolean, default=True, nullable=False)
+    permissions = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+    is_active = Column(Boolean, server_default=text("true"), nullable=False)
 
     # Relationships
-    users = relationship("User", back_populates="role")
+    users = relationship("User", back_populates="role", lazy=AUDITED_LAZY)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
@@ -6,6 +6,9 @@ from app.db.base import Base
 
 class Session(Base):
     __tablename__ = "sessions"
+    __table_args__ = (
+        Index("ix_sessions_user_active", "user_id", "is_revoked"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -13,7 +16,7 @@ class Session(Base):
     refresh_token_jti = Column(String(255), unique=True, nullable=True, index=True)
     expires_at = Column(DateTime(timezone=True), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    is_revoked = Column(Boolean, default=False, nullable=False, index=True)
+    is_revoked = Column(Boolean, server_default=text("false"), nullable=False, index=True)
 
     # Relationships
     user = relationship("User", back_populates="sessions")
@@ -1,25 +1,29 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.db.base import Base
+from app.db.base import Base, AUDITED_LAZY
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_org_active", "organization_id", "is_active"),
+        Index("ix_users_org_role", "organization_id", "role_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(255), unique=True, nullable=False, index=True)
     username = Column(String(100), unique=True, nullable=False, index=True)
     hashed_password = Column(String(255), nullable=False)
     full_name = Column(String(255), nullable=False)
-    is_active = Column(Boolean, default=True, nullable=False, index=True)
-    is_verified = Column(Boolean, default=False, nullable=False)
+    is_active = Column(Boolean, server_default=text("true"), nullable=False, index=True)
+    is_verified = Column(Boolean, server_default=text("false"), nullable=False)
     role_id = Column(Integer, ForeignKey("roles.id"), nullable=False, index=True)
     organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=True, index=True)  # Nullable for system_admin
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     # Relationships
-    role = relationship("Role", back_populates="users")
+    role = relationship("Role", back_populates="users", lazy="joined")  # Read on nearly every request
     organization = relationship("Organization", back_populates="users")
-    sessions = relationship("Session", back_populates="user", cascade="all, delete-orphan")
+    sessions = relationship("Session", back_populates="user", cascade="all, delete-orphan", lazy=AUDITED_LAZY)
@@ -4,7 +4,7 @@ from app.db.session import get_db
 from app.schemas.user import UserCreate, UserLogin, ChangePassword, ForgotPasswordRequest, ResetPasswordRequest
 from app.schemas.token import Token, RefreshTokenRequest
 from app.services import auth_service
-from app.utils.dependencies import get_current_user
+from app.utils.dependencies import get_current_jti, get_current_user
 from app.models.user import User
 from app.schemas.token import Token
 
@@ -12,7 +12,7 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 
 
 @router.post("/register", status_code=201)
-async def register(user: UserCreate, db: Session = Depends(get_db)):
+def register(user: UserCreate, db: Session = Depends(get_db)):
     """
     Register a new user. 
     Account will be inactive until approved by administrator.
@@ -21,13 +21,13 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-async def login(user_login: UserLogin, db: Session = Depends(get_db)):
+def login(user_login: UserLogin, db: Session = Depends(get_db)):
     """Login and get access token."""
     return auth_service.login(db, user_login)
 
 
 @router.post("/refresh", response_model=Token)
-async def refresh_token(
+def refresh_token(
     refresh_request: RefreshTokenRequest,
     db: Session = Depends(get_db)
 ):
@@ -36,18 +36,16 @@ async def refresh_token(
 
 
 @router.post("/logout")
-async def logout(
-    current_user: User = Depends(get_current_user),
+def logout(
+    token_jti: str = Depends(get_current_jti),
     db: Session = Depends(get_db)
 ):
     """Logout and revoke current session."""
-    # Get token JTI from current user's context
-    # This would need to be passed through the dependency
-    return auth_service.logout(db, "")  # Implementation needs token_jti
+    return auth_service.logout(db, token_jti)
 
 
 @router.patch("/change-password")
-async def change_password(
+def change_password(
     password_change: ChangePassword,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -62,7 +60,7 @@ async def change_password(
 
 
 @router.post("/forgot-password")
-async def forgot_password(
+def forgot_password(
     request: ForgotPasswordRequest,
     db: Session = Depends(get_db)
 ):
@@ -71,7 +69,7 @@ async def forgot_password(
 
 
 @router.post("/reset-password")
-async def reset_password(
+def reset_password(
     request: ResetPasswordRequest,
     db: Session = Depends(get_db)
 ):
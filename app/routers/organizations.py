@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.db.session import get_db
 from app.schemas.organization import OrganizationCreate, OrganizationUpdate, OrganizationResponse
 from app.schemas.user import UserCreate
-from app.services import organization_service, user_service, email_service
+from app.services import organization_service, email_service
 from app.utils.dependencies import get_current_user, get_system_admin_user, get_school_admin_or_higher
 from app.models.user import User
 import logging
@@ -15,7 +15,7 @@ router = APIRouter(prefix="/organizations", tags=["organizations"])
 
 
 @router.post("/", response_model=OrganizationResponse, status_code=201)
-async def create_organization(
+def create_organization(
     organization: OrganizationCreate,
     current_user: User = Depends(get_system_admin_user),
     db: Session = Depends(get_db)
@@ -25,57 +25,44 @@ async def create_organization(
     Automatically creates an organization admin user for the new organization.
     Sends welcome email to the organization with admin credentials.
     """
-    # Create the organization
-    new_organization = organization_service.create_organization(db, organization)
-    
     # Store credentials for email (before hashing)
-    admin_username = f"admin.{new_organization.code.lower()}"
-    admin_email = new_organization.email  # Use organization email as admin email
+    admin_username = f"admin.{organization.code.lower()}"
+    admin_email = organization.email  # Use organization email as admin email
     admin_password = "Welcome@1"
     
-    # Create an organization admin user for this organization
+    # Organization admin user, created in the same transaction as the organization
     admin_user = UserCreate(
         username=admin_username,
         email=admin_email,
         password=admin_password,
-        full_name=f"{new_organization.name} Administrator",
+        full_name=f"{organization.name} Administrator",
         role_id=2,  # organization admin role
-        organization_id=new_organization.id
+        organization_id=None  # Assigned once the organization row exists
     )
     
-    user_created = False
-    try:
-        user_service.create_user(db, admin_user)
-        user_created = True
-    except HTTPException:
-        # If user creation fails (e.g., username/email already exists),
-        # we don't rollback the organization creation, just log it
-        logger.warning(f"Failed to create admin user for organization {new_organization.name}")
+    new_organization, db_admin = organization_service.create_organization_with_admin(
+        db, organization, admin_user
+    )
+    user_created = db_admin is not None
     
-    # Send welcome email to organization
+    # Queue the welcome email so SMTP stays off the request path
     if user_created:
-        try:
-            email_sent = email_service.send_organization_welcome_email(
-                organization_name=new_organization.name,
-                organization_email=new_organization.email,
-                organization_code=new_organization.code,
-                admin_username=admin_username,
-                admin_password=admin_password,
-                admin_email=admin_email
-            )
-            if email_sent:
-                logger.info(f"Welcome email sent to {new_organization.email}")
-            else:
-                logger.warning(f"Failed to send welcome email to {new_organization.email}")
-        except Exception as e:
-            # Don't fail the organization creation if email fails
-            logger.error(f"Error sending welcome email: {e}")
+        email_service.submit(
+            email_service.send_organization_welcome_email,
+            organization_name=new_organization.name,
+            organization_email=new_organization.email,
+            organization_code=new_organization.code,
+            admin_username=admin_username,
+            admin_password=admin_password,
+            admin_email=admin_email
+        )
     
     return new_organization
 
 
 @router.get("/", response_model=List[OrganizationResponse])
-async def list_organizations(
+def list_organizations(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     is_active: Optional[bool] = None,
@@ -86,19 +73,20 @@ async def list_organizations(
     List all organizations. System admins see all organizations, organization admins see only their organization.
     """
     # System admin can see all organizations
-    if current_user.role.name == "system_admin":
+    if request.state.is_system_admin:
         return organization_service.get_organizations(db, skip, limit, is_active)
     
     # Organization admin and below can only see their organization
-    if current_user.organization_id:
-        organization = organization_service.get_organization(db, current_user.organization_id)
+    if request.state.org_id:
+        organization = organization_service.get_organization(db, request.state.org_id)
         return [organization] if organization else []
     
     return []
 
 
 @router.get("/{organization_id}", response_model=OrganizationResponse)
-async def get_organization(
+def get_organization(
+    request: Request,
     organization_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -114,11 +102,11 @@ async def get_organization(
         )
     
     # System admin can access any organization
-    if current_user.role.name == "system_admin":
+    if request.state.is_system_admin:
         return organization
     
     # Other users can only access their own organization
-    if current_user.organization_id != organization_id:
+    if request.state.org_id != organization_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You don't have access to this organization"
@@ -128,7 +116,8 @@ async def get_organization(
 
 
 @router.patch("/{organization_id}", response_model=OrganizationResponse)
-async def update_organization(
+def update_organization(
+    request: Request,
     organization_id: int,
     organization_update: OrganizationUpdate,
     current_user: User = Depends(get_school_admin_or_higher),
@@ -138,7 +127,7 @@ async def update_organization(
     Update an organization. System admins can update any organization, organization admins can update their own.
     """
     # Check access
-    if current_user.role.name != "system_admin" and current_user.organization_id != organization_id:
+    if not request.state.is_system_admin and request.state.org_id != organization_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You don't have permission to update this organization"
@@ -148,7 +137,7 @@ async def update_organization(
 
 
 @router.delete("/{organization_id}", status_code=204)
-async def delete_organization(
+def delete_organization(
     organization_id: int,
     current_user: User = Depends(get_system_admin_user),
     db: Session = Depends(get_db)
@@ -161,7 +150,8 @@ async def delete_organization(
 
 
 @router.get("/{organization_id}/users-count")
-async def get_organization_users_count(
+def get_organization_users_count(
+    request: Request,
     organization_id: int,
     current_user: User = Depends(get_school_admin_or_higher),
     db: Session = Depends(get_db)
@@ -170,7 +160,7 @@ async def get_organization_users_count(
     Get count of users in an organization.
     """
     # Check access
-    if current_user.role.name != "system_admin" and current_user.organization_id != organization_id:
+    if not request.state.is_system_admin and request.state.org_id != organization_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You don't have access to this organization's data"
@@ -11,7 +11,7 @@ router = APIRouter(prefix="/roles", tags=["roles"])
 
 
 @router.get("", response_model=List[RoleResponse])
-async def get_roles(
+def get_roles(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
@@ -22,7 +22,7 @@ async def get_roles(
 
 
 @router.post("", response_model=RoleResponse, status_code=201)
-async def create_role(
+def create_role(
     role: RoleCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
@@ -32,7 +32,7 @@ async def create_role(
 
 
 @router.put("/{role_id}", response_model=RoleResponse)
-async def update_role(
+def update_role(
     role_id: int,
     role_update: RoleUpdate,
     db: Session = Depends(get_db),
@@ -43,7 +43,7 @@ async def update_role(
 
 
 @router.delete("/{role_id}")
-async def delete_role(
+def delete_role(
     role_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_admin_user)
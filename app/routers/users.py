@@ -16,13 +16,13 @@ router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+def get_current_user_info(current_user: User = Depends(get_current_user)):
     """Get current user information."""
     return current_user
 
 
 @router.get("", response_model=List[UserResponse])
-async def get_users(
+def get_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     organization_id: Optional[int] = None,
@@ -34,24 +34,22 @@ async def get_users(
     - System admins can see all users across all organizations
     - Organization admins can only see users from their organization
     """
-    # System admin can see all users or filter by organization
-    if current_user.role.name == "system_admin":
-        return user_service.get_users(db, skip=skip, limit=limit, organization_id=organization_id)
-    
-    # Organization admin can only see users from their own organization
+    # Organization admin can only filter by their own organization
     if current_user.role.name == "school_admin":
         if organization_id and organization_id != current_user.organization_id:
             raise HTTPException(
                 status_code=403, 
                 detail="You can only view users from your own organization"
             )
-        return user_service.get_users(db, skip=skip, limit=limit, organization_id=current_user.organization_id)
     
-    raise HTTPException(status_code=403, detail="Not authorized")
+    # Role-based visibility is applied in SQL, so offset/limit page over visible rows only
+    return user_service.list_users_projected(
+        db, current_user, skip=skip, limit=limit, organization_id=organization_id
+    )
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user(
+def get_user(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -76,7 +74,7 @@ async def get_user(
 
 
 @router.patch("/{user_id}", response_model=UserResponse)
-async def update_user(
+def update_user(
     user_id: int,
     user_update: UserUpdate,
     db: Session = Depends(get_db),
@@ -117,7 +115,7 @@ async def update_user(
 
 
 @router.delete("/{user_id}")
-async def delete_user(
+def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_school_admin_or_higher)
@@ -142,7 +140,7 @@ async def delete_user(
 
 
 @router.post("", response_model=UserResponse)
-async def create_user(
+def create_user(
     user_create: UserCreate,
     auto_generate_password: bool = True,  # Default to auto-generate
     db: Session = Depends(get_db),
@@ -0,0 +1,21 @@
+from typing import Annotated
+from pydantic import AfterValidator, BaseModel, ConfigDict, StringConstraints
+
+
+def _lowercase_domain(email: str) -> str:
+    # Matches EmailStr normalisation so updated addresses still match at login
+    local, _, domain = email.rpartition("@")
+    return f"{local}@{domain.lower()}"
+
+
+# Cheap shape check for update payloads; entry points (create, login) keep full EmailStr validation
+UpdateEmailStr = Annotated[
+    str,
+    StringConstraints(max_length=320, pattern=r"^[^@\s]+@[^@\s]+\.[^@\s]+$"),
+    AfterValidator(_lowercase_domain)
+]
+
+
+class ORMResponse(BaseModel):
+    """Base for response schemas built from ORM objects."""
+    model_config = ConfigDict(from_attributes=True)
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, EmailStr, ConfigDict
+from pydantic import BaseModel, EmailStr
 from datetime import datetime
+from app.schemas.base import ORMResponse
 
 
 class OrganizationBase(BaseModel):
@@ -32,10 +33,8 @@ class OrganizationUpdate(BaseModel):
     is_active: bool | None = None
 
 
-class OrganizationResponse(OrganizationBase):
+class OrganizationResponse(OrganizationBase, ORMResponse):
     id: int
     is_active: bool
     created_at: datetime
     updated_at: datetime
-
-    model_config = ConfigDict(from_attributes=True)
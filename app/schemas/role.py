@@ -1,5 +1,6 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel
 from typing import Dict, Any
+from app.schemas.base import ORMResponse
 
 
 class RoleBase(BaseModel):
@@ -19,8 +20,6 @@ class RoleUpdate(BaseModel):
     is_active: bool | None = None
 
 
-class RoleResponse(RoleBase):
+class RoleResponse(RoleBase, ORMResponse):
     id: int
     is_active: bool
-
-    model_config = ConfigDict(from_attributes=True)
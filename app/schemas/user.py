@@ -1,7 +1,8 @@
-from pydantic import BaseModel, EmailStr, ConfigDict
+from pydantic import BaseModel, EmailStr
 from datetime import datetime
 from app.schemas.role import RoleResponse
 from app.schemas.organization import OrganizationResponse
+from app.schemas.base import ORMResponse, UpdateEmailStr
 
 
 class UserBase(BaseModel):
@@ -17,14 +18,14 @@ class UserCreate(UserBase):
 
 
 class UserUpdate(BaseModel):
-    email: EmailStr | None = None
+    email: UpdateEmailStr | None = None
     full_name: str | None = None
     is_active: bool | None = None
     role_id: int | None = None
     organization_id: int | None = None
 
 
-class UserResponse(UserBase):
+class UserResponse(UserBase, ORMResponse):
     id: int
     is_active: bool
     is_verified: bool
@@ -36,8 +37,6 @@ class UserResponse(UserBase):
     updated_at: datetime
     generated_password: str | None = None  # For admin to see generated password
 
-    model_config = ConfigDict(from_attributes=True)
-
 
 class UserLogin(BaseModel):
     email: EmailStr
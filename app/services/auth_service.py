@@ -1,11 +1,14 @@
+from sqlalchemy import delete, insert, or_, select, update
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta, timezone
+from app.models.role import Role
 from app.models.user import User
 from app.models.session import Session as UserSession
 from app.schemas.user import UserCreate, UserLogin
 from app.schemas.token import Token
 from app.utils.security import (
     verify_password,
+    verify_and_update_password,
     create_access_token,
     create_refresh_token,
     decode_token,
@@ -13,9 +16,15 @@ from app.utils.security import (
     create_password_reset_token,
     verify_password_reset_token
 )
+from app.services.role_cache import get_role_name
 from app.services.user_service import create_user, get_user_by_email
+from app.utils import auth_cache
 from fastapi import HTTPException, status
-from app.db.session import settings
+from app.db.session import get_settings
+from typing import List
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 def register_user(db: Session, user: UserCreate) -> User:
@@ -56,8 +65,12 @@ def authenticate_user(db: Session, email: str, password: str) -> User | None:
     user = get_user_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    is_valid, new_hash = verify_and_update_password(password, user.hashed_password)
+    if not is_valid:
         return None
+    if new_hash:
+        # Legacy bcrypt hash; persisted with the login session commit
+        user.hashed_password = new_hash
     return user
 
 
@@ -88,25 +101,28 @@ def login(db: Session, user_login: UserLogin) -> Token:
     access_token, access_jti = create_access_token(token_data)
     refresh_token, refresh_jti = create_refresh_token(token_data)
     
-    print(f"🔐 LOGIN: Creating session for user {user.id} with JTI: {access_jti[:30]}...")
+    logger.debug("LOGIN: creating session for user %s with jti %.30s...", user.id, access_jti)
     
     # Create session
-    expires_at = datetime.now(timezone.utc) + timedelta(minutes=settings.access_token_expire_minutes)
-    session = UserSession(
-        user_id=user.id,
-        token_jti=access_jti,
-        refresh_token_jti=refresh_jti,
-        expires_at=expires_at
-    )
-    db.add(session)
+    expires_at = datetime.now(timezone.utc) + timedelta(minutes=get_settings().access_token_expire_minutes)
+    # INSERT ... RETURNING in one round trip; no refresh SELECT afterwards
+    session_id = db.execute(
+        insert(UserSession).values(
+            user_id=user.id,
+            token_jti=access_jti,
+            refresh_token_jti=refresh_jti,
+            expires_at=expires_at
+        ).returning(UserSession.id)
+    ).scalar_one()
     db.commit()
-    db.refresh(session)
     
-    print(f"✅ SESSION CREATED: ID={session.id}, JTI={session.token_jti[:30]}..., expires={expires_at}")
+    logger.debug("Session %s created for jti %.30s..., expires %s", session_id, access_jti, expires_at)
     
-    return Token(
+    # Server-produced values; skip the validation pass
+    return Token.model_construct(
         access_token=access_token,
-        refresh_token=refresh_token
+        refresh_token=refresh_token,
+        token_type="bearer"
     )
 
 
@@ -134,21 +150,25 @@ def refresh_access_token(db: Session, refresh_token: str) -> Token:
             )
         refresh_jti = payload.get("jti")
         
-        # Find session with this refresh token
-        session = db.query(UserSession).filter(
-            UserSession.user_id == user_id,
-            UserSession.refresh_token_jti == refresh_jti,
-            UserSession.is_revoked == False
+        # Find session with this refresh token; only its id and current access jti are needed
+        session = db.execute(
+            select(UserSession.id, UserSession.token_jti).where(
+                UserSession.user_id == user_id,
+                UserSession.refresh_token_jti == refresh_jti,
+                UserSession.is_revoked == False
+            ).limit(1)
         ).first()
         
-        if not session:
+        if session is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid refresh token"
             )
         
-        # Get user
-        user = db.query(User).filter(User.id == user_id).first()
+        # Get the user columns the token needs; the role name comes from the role cache
+        user = db.execute(
+            select(User.email, User.is_active, User.role_id).where(User.id == user_id)
+        ).first()
         if not user or not user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -157,21 +177,32 @@ def refresh_access_token(db: Session, refresh_token: str) -> Token:
         
         # Create new access token (JWT spec: sub must be string)
         token_data = {
-            "sub": str(user.id),
+            "sub": str(user_id),
             "email": user.email,
-            "role": user.role.name
+            "role": get_role_name(user.role_id)
+            or db.execute(select(Role.name).where(Role.id == user.role_id)).scalar()
         }
         
         new_access_token, new_access_jti = create_access_token(token_data)
         
         # Update session
-        session.token_jti = new_access_jti
-        session.expires_at = datetime.now(timezone.utc) + timedelta(minutes=settings.access_token_expire_minutes)
+        db.execute(
+            update(UserSession)
+            .where(UserSession.id == session.id)
+            .values(
+                token_jti=new_access_jti,
+                expires_at=datetime.now(timezone.utc) + timedelta(minutes=get_settings().access_token_expire_minutes)
+            )
+            .execution_options(synchronize_session=False)
+        )
         db.commit()
+        # The replaced access token must stop working here too, not only after the auth cache TTL
+        auth_cache.revoke_tokens([session.token_jti])
         
-        return Token(
+        return Token.model_construct(
             access_token=new_access_token,
-            refresh_token=refresh_token
+            refresh_token=refresh_token,
+            token_type="bearer"
         )
         
     except ValueError:
@@ -183,15 +214,57 @@ def refresh_access_token(db: Session, refresh_token: str) -> Token:
 
 def logout(db: Session, token_jti: str):
     """Logout user by revoking session."""
-    session = db.query(UserSession).filter(UserSession.token_jti == token_jti).first()
-    if session:
-        session.is_revoked = True
-        db.commit()
+    # Revoke by jti directly; no need to load the session row first
+    db.execute(
+        update(UserSession)
+        .where(UserSession.token_jti == token_jti)
+        .values(is_revoked=True)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    auth_cache.revoke_tokens([token_jti])
     return {"message": "Logged out successfully"}
 
 
+def purge_stale_sessions(db: Session) -> int:
+    """
+    Bulk-delete sessions that can no longer be used: revoked and expired, or
+    expired for longer than a refresh token lives. Returns the number deleted.
+    """
+    now = datetime.now(timezone.utc)
+    refresh_cutoff = now - timedelta(days=get_settings().refresh_token_expire_days)
+    result = db.execute(
+        delete(UserSession)
+        .where(
+            UserSession.expires_at < now,
+            or_(UserSession.is_revoked == True, UserSession.expires_at < refresh_cutoff)
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def _revoke_user_sessions(db: Session, user_id: int) -> List[str]:
+    """Revoke every active session of a user in one UPDATE; returns the revoked access-token jtis."""
+    return db.execute(
+        update(UserSession)
+        .where(UserSession.user_id == user_id, UserSession.is_revoked == False)
+        .values(is_revoked=True)
+        .returning(UserSession.token_jti)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+
+
 def change_password(db: Session, user: User, old_password: str, new_password: str):
     """Change user password."""
+    # The authenticated user may be a detached cache snapshot; check and update the stored row
+    user = db.get(User, user.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
     if not verify_password(old_password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -201,12 +274,10 @@ def change_password(db: Session, user: User, old_password: str, new_password: st
     user.hashed_password = get_password_hash(new_password)
     
     # Revoke all existing sessions
-    db.query(UserSession).filter(
-        UserSession.user_id == user.id,
-        UserSession.is_revoked == False
-    ).update({"is_revoked": True})
+    revoked_jtis = _revoke_user_sessions(db, user.id)
     
     db.commit()
+    auth_cache.revoke_tokens(revoked_jtis)
     return {"message": "Password changed successfully. Please login again."}
 
 
@@ -237,7 +308,7 @@ def request_password_reset(db: Session, email: str):
     
     # TODO: Implement SMTP email sending
     # Example implementation:
-    # reset_link = f"{settings.password_reset_url}?token={reset_token}"
+    # reset_link = f"{get_settings().password_reset_url}?token={reset_token}"
     # send_email(
     #     to_email=user.email,
     #     subject="Password Reset Request",
@@ -245,7 +316,6 @@ def request_password_reset(db: Session, email: str):
     # )
     
     # For now, we'll return the token (for development/testing only)
-    print(f"🔐 Password reset token for {email}: {reset_token}")
     
     # TODO: Store token in database with expiry for additional security
     
@@ -285,10 +355,8 @@ def reset_password(db: Session, token: str, new_password: str):
     user.hashed_password = get_password_hash(new_password)
     
     # Revoke all existing sessions
-    db.query(UserSession).filter(
-        UserSession.user_id == user.id,
-        UserSession.is_revoked == False
-    ).update({"is_revoked": True})
+    revoked_jtis = _revoke_user_sessions(db, user.id)
     
     db.commit()
+    auth_cache.revoke_tokens(revoked_jtis)
     return {"message": "Password has been reset successfully. Please login with your new password."}
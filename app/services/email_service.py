@@ -1,141 +1,157 @@
+import atexit
+import base64
+import re
+import secrets
 import smtplib
 import ssl
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import List
+import threading
+import time
+from string import Formatter
+from concurrent.futures import Future, ThreadPoolExecutor
+from email.header import Header
+from email.utils import formataddr
+from typing import Callable, List
 import logging
 import certifi
-from app.db.session import settings
+from app.db.session import get_settings
 
 logger = logging.getLogger(__name__)
 
 
-class EmailService:
-    """Service for sending emails via Gmail SMTP"""
+def _create_ssl_context() -> ssl.SSLContext:
+    """Build the TLS context once; parsing the CA bundle is disk- and CPU-bound."""
+    try:
+        # Use certifi's certificate bundle (works better on macOS)
+        return ssl.create_default_context(cafile=certifi.where())
+    except Exception:
+        # Fallback to default context
+        return ssl.create_default_context()
+
+
+_SSL_CONTEXT = _create_ssl_context()
+
+_EOL = re.compile(r"\r\n|\n|\r")
+_LEADING_PERIOD = re.compile(r"^\.", re.MULTILINE)
+
+# Messages always have the same multipart/alternative shape, so the MIME skeleton is
+# rendered once here and send_email only fills in headers and base64-encoded bodies,
+# instead of building MIMEMultipart objects and running email.generator per send.
+# Base64 lines never start with "--", so one boundary per process is safe.
+_BOUNDARY = f"==============={secrets.token_hex(16)}=="
+_MESSAGE_HEAD = (
+    f'Content-Type: multipart/alternative; boundary="{_BOUNDARY}"\n'
+    "MIME-Version: 1.0\n"
+    "Subject: {subject}\n"
+    "From: {from_header}\n"
+    "To: {to_header}\n"
+    "\n"
+)
+_TEXT_PART = (
+    f"--{_BOUNDARY}\n"
+    'Content-Type: text/plain; charset="utf-8"\n'
+    "MIME-Version: 1.0\n"
+    "Content-Transfer-Encoding: base64\n"
+    "\n"
+    "{body}"
+)
+_HTML_PART = _TEXT_PART.replace("text/plain", "text/html")
+_MESSAGE_END = f"--{_BOUNDARY}--\n"
+
+# A connection used this recently is assumed alive, so back-to-back sends (e.g. a bulk
+# activation draining through the queue) skip the NOOP round trip; send_email still
+# reconnects once if the server dropped it after all.
+_NOOP_AFTER_IDLE_SECONDS = 10
+
+
+def _encode_header(value: str) -> str:
+    """Header value on one line, RFC 2047-encoded when it is not plain ASCII."""
+    value = _EOL.sub(" ", value)
+    if value.isascii():
+        return value
+    return Header(value, "utf-8").encode()
+
+
+def _build_message(from_header: str, to_header: str, subject: str, html_content: str, text_content: str = None) -> str:
+    """Render a multipart/alternative message from the prebuilt skeleton."""
+    parts = [_MESSAGE_HEAD.format(
+        subject=_encode_header(subject),
+        from_header=_encode_header(from_header),
+        to_header=_encode_header(to_header)
+    )]
+    if text_content:
+        parts.append(_TEXT_PART.format(body=base64.encodebytes(text_content.encode()).decode("ascii")))
+    parts.append(_HTML_PART.format(body=base64.encodebytes(html_content.encode()).decode("ascii")))
+    parts.append(_MESSAGE_END)
+    return "".join(parts)
+
+
+def _reset(server: smtplib.SMTP) -> None:
+    try:
+        server.rset()
+    except smtplib.SMTPServerDisconnected:
+        pass
+
+
+def _sendmail(server: smtplib.SMTP, from_addr: str, recipients: List[str], message: str) -> dict:
+    """
+    Like SMTP.sendmail, but when the server supports PIPELINING (RFC 2920) the
+    MAIL FROM, RCPT TO and DATA commands go out in one write and their replies
+    are read back in order, saving a round trip per command.
+    Returns the refused recipients, as sendmail does.
+    """
+    server.ehlo_or_helo_if_needed()
+    if not server.has_extn("pipelining"):
+        return server.sendmail(from_addr, recipients, message)
     
-    def __init__(self):
-        self.smtp_host = settings.smtp_host
-        self.smtp_port = settings.smtp_port
-        self.smtp_user = settings.smtp_user
-        self.smtp_password = settings.smtp_password
-        self.smtp_from = settings.smtp_from
-        self.smtp_from_name = settings.smtp_from_name
+    # Same normalisation as SMTP.data: CRLF line endings and dot-stuffing
+    body = _LEADING_PERIOD.sub("..", _EOL.sub("\r\n", message)).encode("ascii")
+    if not body.endswith(b"\r\n"):
+        body += b"\r\n"
     
-    def send_email(
-        self,
-        to_email: str | List[str],
-        subject: str,
-        html_content: str,
-        text_content: str = None
-    ) -> bool:
-        """
-        Send an email via Gmail SMTP
-        
-        Args:
-            to_email: Recipient email address or list of addresses
-            subject: Email subject
-            html_content: HTML content of the email
-            text_content: Plain text fallback (optional)
-            
-        Returns:
-            True if email sent successfully, False otherwise
-        """
-        try:
-            # Validate SMTP configuration
-            if not self.smtp_user or not self.smtp_password:
-                logger.error("SMTP credentials not configured")
-                return False
-            
-            # Create message
-            message = MIMEMultipart("alternative")
-            message["Subject"] = subject
-            message["From"] = f"{self.smtp_from_name} <{self.smtp_from}>"
-            
-            # Handle single or multiple recipients
-            if isinstance(to_email, list):
-                message["To"] = ", ".join(to_email)
-                recipients = to_email
-            else:
-                message["To"] = to_email
-                recipients = [to_email]
-            
-            # Attach text and HTML parts
-            if text_content:
-                text_part = MIMEText(text_content, "plain")
-                message.attach(text_part)
-            
-            html_part = MIMEText(html_content, "html")
-            message.attach(html_part)
-            
-            # Connect to Gmail SMTP server and send email
-            # Create SSL context with proper certificate handling
-            try:
-                # Use certifi's certificate bundle (works better on macOS)
-                context = ssl.create_default_context(cafile=certifi.where())
-            except:
-                # Fallback to default context
-                context = ssl.create_default_context()
-            
-            # Try method 1: SSL on port 465 (more reliable than STARTTLS)
-            try:
-                server = smtplib.SMTP_SSL(self.smtp_host, 465, timeout=30, context=context)
-                server.login(self.smtp_user, self.smtp_password)
-                server.sendmail(self.smtp_from, recipients, message.as_string())
-                server.quit()
-            except Exception as ssl_error:
-                logger.warning(f"SSL connection failed, trying STARTTLS: {ssl_error}")
-                
-                # Method 2: Try STARTTLS on port 587
-                try:
-                    server = smtplib.SMTP(self.smtp_host, 587, timeout=30)
-                    server.starttls(context=context)
-                    server.login(self.smtp_user, self.smtp_password)
-                    server.sendmail(self.smtp_from, recipients, message.as_string())
-                    server.quit()
-                except Exception as tls_error:
-                    logger.error(f"STARTTLS connection also failed: {tls_error}")
-                    raise  # Re-raise the last exception
-            
-            logger.info(f"Email sent successfully to {recipients}")
-            return True
-            
-        except smtplib.SMTPAuthenticationError as e:
-            logger.error(f"SMTP authentication failed: {e}")
-            return False
-        except smtplib.SMTPException as e:
-            logger.error(f"SMTP error occurred: {e}")
-            return False
-        except Exception as e:
-            logger.error(f"Failed to send email: {e}")
-            return False
+    size_option = f" SIZE={len(body)}" if server.has_extn("size") else ""
+    commands = [f"MAIL FROM:{smtplib.quoteaddr(from_addr)}{size_option}"]
+    commands += [f"RCPT TO:{smtplib.quoteaddr(recipient)}" for recipient in recipients]
+    commands.append("DATA")
+    server.send("".join(f"{command}\r\n" for command in commands))
     
-    def send_organization_welcome_email(
-        self,
-        organization_name: str,
-        organization_email: str,
-        organization_code: str,
-        admin_username: str,
-        admin_password: str,
-        admin_email: str
-    ) -> bool:
-        """
-        Send welcome email to newly created organization
-        
-        Args:
-            organization_name: Name of the organization
-            organization_email: Organization's email address
-            organization_code: Organization code
-            admin_username: Admin user's username
-            admin_password: Admin user's password
-            admin_email: Admin user's email
-            
-        Returns:
-            True if email sent successfully, False otherwise
-        """
-        subject = f"Welcome to VYON - {organization_name} Organization Created"
-        
-        # HTML email template
-        html_content = f"""
+    mail_code, mail_reply = server.getreply()
+    rcpt_replies = [server.getreply() for _ in recipients]
+    data_code, data_reply = server.getreply()
+    
+    if 421 in (mail_code, data_code) or any(code == 421 for code, _ in rcpt_replies):
+        server.close()
+        raise smtplib.SMTPServerDisconnected("Server closed the connection during send (421)")
+    
+    refused = {
+        recipient: reply
+        for recipient, reply in zip(recipients, rcpt_replies)
+        if reply[0] not in (250, 251)
+    }
+    if data_code == 354 and (mail_code != 250 or len(refused) == len(recipients)):
+        # Server opened DATA with nobody to deliver to; close the empty message
+        server.send(b".\r\n")
+        server.getreply()
+    if mail_code != 250:
+        _reset(server)
+        raise smtplib.SMTPSenderRefused(mail_code, mail_reply, from_addr)
+    if len(refused) == len(recipients):
+        _reset(server)
+        raise smtplib.SMTPRecipientsRefused(refused)
+    if data_code != 354:
+        _reset(server)
+        raise smtplib.SMTPDataError(data_code, data_reply)
+    
+    server.send(body + b".\r\n")
+    code, reply = server.getreply()
+    if code != 250:
+        _reset(server)
+        raise smtplib.SMTPDataError(code, reply)
+    return refused
+
+
+# Email bodies are static text with str.format placeholders; each *_SRC string is parsed
+# into a _Template below. Literal CSS braces are doubled.
+_ORG_WELCOME_HTML_SRC = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -254,7 +270,7 @@ class EmailService:
         </ul>
         
         <center>
-            <a href="{settings.frontend_url}/login" class="button">Access Dashboard →</a>
+            <a href="{frontend_url}/login" class="button">Access Dashboard →</a>
         </center>
         
         <p style="margin-top: 30px;">If you have any questions or need assistance, please don't hesitate to reach out to our support team.</p>
@@ -270,9 +286,9 @@ class EmailService:
 </body>
 </html>
 """
-        
-        # Plain text fallback
-        text_content = f"""
+
+
+_ORG_WELCOME_TEXT_SRC = """
 Welcome to VYON - {organization_name}
 
 Congratulations! Your organization has been successfully registered with VYON's School Management System.
@@ -297,7 +313,7 @@ What's Next?
 4. Set up classes and subjects
 5. Start managing your educational content
 
-Login URL: {settings.frontend_url}/login
+Login URL: {frontend_url}/login
 
 If you have any questions or need assistance, please don't hesitate to reach out to our support team.
 
@@ -308,35 +324,9 @@ The VYON Team
 This is an automated message from VYON School Management System.
 © 2026 VYON - Boundless Knowledge. All rights reserved.
 """
-        
-        return self.send_email(
-            to_email=organization_email,
-            subject=subject,
-            html_content=html_content,
-            text_content=text_content
-        )
-    
-    def send_user_activation_email(
-        self,
-        user_email: str,
-        user_name: str,
-        username: str
-    ) -> bool:
-        """
-        Send email notification when user account is activated by admin
-        
-        Args:
-            user_email: User's email address
-            user_name: User's full name
-            username: User's username
-            
-        Returns:
-            True if email sent successfully, False otherwise
-        """
-        subject = f"Your VYON Account Has Been Activated! 🎉"
-        
-        # HTML email template
-        html_content = f"""
+
+
+_ACTIVATION_HTML_SRC = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -445,7 +435,7 @@ This is an automated message from VYON School Management System.
         </ul>
         
         <center>
-            <a href="{settings.frontend_url}/login" class="button">Login to Your Account →</a>
+            <a href="{frontend_url}/login" class="button">Login to Your Account →</a>
         </center>
         
         <p style="margin-top: 30px;">If you have any questions or need assistance getting started, please don't hesitate to reach out to your organization administrator or our support team.</p>
@@ -461,9 +451,9 @@ This is an automated message from VYON School Management System.
 </body>
 </html>
 """
-        
-        # Plain text fallback
-        text_content = f"""
+
+
+_ACTIVATION_TEXT_SRC = """
 Account Activated - Welcome to VYON!
 
 Hello {user_name}!
@@ -485,7 +475,7 @@ What You Can Do Now:
 4. Collaborate with other teachers and staff
 5. Start creating engaging lessons for your students
 
-Login URL: {settings.frontend_url}/login
+Login URL: {frontend_url}/login
 
 If you have any questions or need assistance getting started, please don't hesitate to reach out to your organization administrator or our support team.
 
@@ -496,36 +486,9 @@ The VYON Team
 This is an automated message from VYON School Management System.
 © 2026 VYON - Boundless Knowledge. All rights reserved.
 """
-        
-        return self.send_email(
-            to_email=user_email,
-            subject=subject,
-            html_content=html_content,
-            text_content=text_content
-        )
 
-    def send_user_created_email(
-        self,
-        user_email: str,
-        user_name: str,
-        username: str,
-        temporary_password: str
-    ) -> bool:
-        """
-        Send email when admin creates a user with a generated password.
 
-        Args:
-            user_email: User's email address
-            user_name: User's full name
-            username: User's username
-            temporary_password: Generated password
-
-        Returns:
-            True if email sent successfully, False otherwise
-        """
-        subject = "Your VYON Account Is Ready"
-
-        html_content = f"""
+_USER_CREATED_HTML_SRC = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -603,7 +566,7 @@ This is an automated message from VYON School Management System.
         <p>Please log in and change your password after your first sign-in.</p>
 
         <center>
-            <a href="{settings.frontend_url}/login" class="button">Login to Your Account →</a>
+            <a href="{frontend_url}/login" class="button">Login to Your Account →</a>
         </center>
 
         <p style="margin-top: 30px;">If you need help, contact your organization administrator or our support team.</p>
@@ -620,7 +583,8 @@ This is an automated message from VYON School Management System.
 </html>
 """
 
-        text_content = f"""
+
+_USER_CREATED_TEXT_SRC = """
 Your VYON Account Is Ready
 
 Hello {user_name}!
@@ -634,7 +598,7 @@ Login Credentials:
 
 Please log in and change your password after your first sign-in.
 
-Login URL: {settings.frontend_url}/login
+Login URL: {frontend_url}/login
 
 If you need help, contact your organization administrator or our support team.
 
@@ -646,6 +610,307 @@ This is an automated message from VYON School Management System.
 © 2026 VYON - Boundless Knowledge. All rights reserved.
 """
 
+
+class _Template:
+    """
+    A str.format template parsed once into (literal, field) pairs, so rendering is a
+    single join instead of re-parsing several KB of markup on every send.
+    Only plain {field} placeholders are supported.
+    """
+    
+    __slots__ = ("_parts",)
+    
+    def __init__(self, template: str):
+        self._parts = tuple((literal, field) for literal, field, _, _ in Formatter().parse(template))
+    
+    def render(self, fields: dict) -> str:
+        return "".join([literal + str(fields[field]) if field is not None else literal for literal, field in self._parts])
+
+
+_ORG_WELCOME_HTML = _Template(_ORG_WELCOME_HTML_SRC)
+_ORG_WELCOME_TEXT = _Template(_ORG_WELCOME_TEXT_SRC)
+_ACTIVATION_HTML = _Template(_ACTIVATION_HTML_SRC)
+_ACTIVATION_TEXT = _Template(_ACTIVATION_TEXT_SRC)
+_USER_CREATED_HTML = _Template(_USER_CREATED_HTML_SRC)
+_USER_CREATED_TEXT = _Template(_USER_CREATED_TEXT_SRC)
+
+
+def _log_send_result(future: Future) -> None:
+    """Done-callback for queued sends; send_* methods log their own successes."""
+    try:
+        if not future.result():
+            logger.warning("Queued email was not sent")
+    except Exception as e:
+        logger.error(f"Error sending queued email: {e}")
+
+
+class EmailService:
+    """Service for sending emails via Gmail SMTP"""
+    
+    def __init__(self):
+        settings = get_settings()
+        self.smtp_host = settings.smtp_host
+        self.smtp_port = settings.smtp_port
+        self.smtp_user = settings.smtp_user
+        self.smtp_password = settings.smtp_password
+        self.smtp_from = settings.smtp_from
+        self.smtp_from_name = settings.smtp_from_name
+        # One authenticated connection reused across sends; smtplib is not thread-safe
+        self._smtp: smtplib.SMTP | None = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+        # Sends share one connection, so a single worker keeps them ordered without lock contention
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="email")
+        atexit.register(self.close)
+        
+        # Validate SMTP configuration once; without credentials every send is a logged no-op
+        if not self.smtp_user or not self.smtp_password:
+            logger.warning("SMTP credentials not configured; outgoing email is disabled")
+            self.send_email = self._send_disabled
+    
+    def _send_disabled(self, to_email: str | List[str], *args, **kwargs) -> bool:
+        """Stand-in for send_email when SMTP is not configured."""
+        logger.error(f"SMTP credentials not configured; email to {to_email} not sent")
+        return False
+    
+    def _connect(self) -> smtplib.SMTP:
+        """Open and authenticate a new SMTP connection."""
+        # Try method 1: SSL on port 465 (more reliable than STARTTLS)
+        try:
+            server = smtplib.SMTP_SSL(self.smtp_host, 465, timeout=30, context=_SSL_CONTEXT)
+            server.login(self.smtp_user, self.smtp_password)
+            return server
+        except Exception as ssl_error:
+            logger.warning(f"SSL connection failed, trying STARTTLS: {ssl_error}")
+            
+            # Method 2: Try STARTTLS on port 587
+            try:
+                server = smtplib.SMTP(self.smtp_host, 587, timeout=30)
+                server.starttls(context=_SSL_CONTEXT)
+                server.login(self.smtp_user, self.smtp_password)
+                return server
+            except Exception as tls_error:
+                logger.error(f"STARTTLS connection also failed: {tls_error}")
+                raise  # Re-raise the last exception
+    
+    def _get_connection(self) -> smtplib.SMTP:
+        """Return the cached connection if the server still answers NOOP, else reconnect. Caller holds the lock."""
+        if self._smtp is not None:
+            if time.monotonic() - self._last_used < _NOOP_AFTER_IDLE_SECONDS:
+                return self._smtp
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._discard_connection()
+        
+        self._smtp = self._connect()
+        return self._smtp
+    
+    def _discard_connection(self) -> None:
+        """Drop the cached connection without raising. Caller holds the lock."""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
+    
+    def close(self) -> None:
+        """Finish queued sends, then close the cached SMTP connection, if any."""
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._discard_connection()
+    
+    def submit(self, send: Callable[..., bool], **kwargs) -> Future:
+        """
+        Queue an email for background delivery; this is the API request handlers should use.
+        send is one of the send_* methods (e.g. submit(email_service.send_user_created_email, ...)),
+        run on the email worker instead of the calling thread.
+        Failures are logged; the returned future resolves to the send result.
+        """
+        future = self._executor.submit(send, **kwargs)
+        future.add_done_callback(_log_send_result)
+        return future
+    
+    def send_email(
+        self,
+        to_email: str | List[str],
+        subject: str,
+        html_content: str,
+        text_content: str = None
+    ) -> bool:
+        """
+        Send an email via Gmail SMTP
+        
+        Args:
+            to_email: Recipient email address or list of addresses
+            subject: Email subject
+            html_content: HTML content of the email
+            text_content: Plain text fallback (optional)
+            
+        Returns:
+            True if email sent successfully, False otherwise
+        """
+        try:
+            # Handle single or multiple recipients
+            recipients = to_email if isinstance(to_email, list) else [to_email]
+            
+            # Create message with text and HTML parts
+            message_string = _build_message(
+                from_header=formataddr((self.smtp_from_name, self.smtp_from)),
+                to_header=", ".join(recipients),
+                subject=subject,
+                html_content=html_content,
+                text_content=text_content
+            )
+            
+            # Send over the shared Gmail SMTP connection
+            with self._lock:
+                reused = self._smtp is not None
+                try:
+                    _sendmail(self._get_connection(), self.smtp_from, recipients, message_string)
+                except (smtplib.SMTPServerDisconnected, OSError) as e:
+                    if not reused:
+                        raise
+                    # The server dropped the connection since it was last checked; reconnect once
+                    logger.warning(f"SMTP connection lost, reconnecting: {e}")
+                    self._discard_connection()
+                    _sendmail(self._get_connection(), self.smtp_from, recipients, message_string)
+                self._last_used = time.monotonic()
+            
+            logger.info(f"Email sent successfully to {recipients}")
+            return True
+            
+        except smtplib.SMTPAuthenticationError as e:
+            logger.error(f"SMTP authentication failed: {e}")
+            return False
+        except smtplib.SMTPException as e:
+            logger.error(f"SMTP error occurred: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"Failed to send email: {e}")
+            return False
+    
+    def send_organization_welcome_email(
+        self,
+        organization_name: str,
+        organization_email: str,
+        organization_code: str,
+        admin_username: str,
+        admin_password: str,
+        admin_email: str
+    ) -> bool:
+        """
+        Send welcome email to newly created organization
+        
+        Args:
+            organization_name: Name of the organization
+            organization_email: Organization's email address
+            organization_code: Organization code
+            admin_username: Admin user's username
+            admin_password: Admin user's password
+            admin_email: Admin user's email
+            
+        Returns:
+            True if email sent successfully, False otherwise
+        """
+        subject = f"Welcome to VYON - {organization_name} Organization Created"
+        fields = {
+            "organization_name": organization_name,
+            "organization_email": organization_email,
+            "organization_code": organization_code,
+            "admin_username": admin_username,
+            "admin_password": admin_password,
+            "admin_email": admin_email,
+            "frontend_url": get_settings().frontend_url
+        }
+        
+        # HTML email template
+        html_content = _ORG_WELCOME_HTML.render(fields)
+        
+        # Plain text fallback
+        text_content = _ORG_WELCOME_TEXT.render(fields)
+        
+        return self.send_email(
+            to_email=organization_email,
+            subject=subject,
+            html_content=html_content,
+            text_content=text_content
+        )
+    
+    def send_user_activation_email(
+        self,
+        user_email: str,
+        user_name: str,
+        username: str
+    ) -> bool:
+        """
+        Send email notification when user account is activated by admin
+        
+        Args:
+            user_email: User's email address
+            user_name: User's full name
+            username: User's username
+            
+        Returns:
+            True if email sent successfully, False otherwise
+        """
+        subject = f"Your VYON Account Has Been Activated! 🎉"
+        fields = {
+            "user_email": user_email,
+            "user_name": user_name,
+            "username": username,
+            "frontend_url": get_settings().frontend_url
+        }
+        
+        # HTML email template
+        html_content = _ACTIVATION_HTML.render(fields)
+        
+        # Plain text fallback
+        text_content = _ACTIVATION_TEXT.render(fields)
+        
+        return self.send_email(
+            to_email=user_email,
+            subject=subject,
+            html_content=html_content,
+            text_content=text_content
+        )
+
+    def send_user_created_email(
+        self,
+        user_email: str,
+        user_name: str,
+        username: str,
+        temporary_password: str
+    ) -> bool:
+        """
+        Send email when admin creates a user with a generated password.
+
+        Args:
+            user_email: User's email address
+            user_name: User's full name
+            username: User's username
+            temporary_password: Generated password
+
+        Returns:
+            True if email sent successfully, False otherwise
+        """
+        subject = "Your VYON Account Is Ready"
+        fields = {
+            "user_email": user_email,
+            "user_name": user_name,
+            "username": username,
+            "temporary_password": temporary_password,
+            "frontend_url": get_settings().frontend_url
+        }
+
+        html_content = _USER_CREATED_HTML.render(fields)
+
+        text_content = _USER_CREATED_TEXT.render(fields)
+
         return self.send_email(
             to_email=user_email,
             subject=subject,
@@ -1,43 +1,81 @@
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 from app.models.organization import Organization
+from app.models.user import User
 from app.schemas.organization import OrganizationCreate, OrganizationUpdate
-from typing import List, Optional
+from app.schemas.user import UserCreate
+from app.services import user_service
+from app.utils import auth_cache
+from typing import List, Optional, Tuple
+import logging
 
+logger = logging.getLogger(__name__)
 
-def create_organization(db: Session, organization: OrganizationCreate) -> Organization:
-    """Create a new organization."""
-    # Check if organization code already exists
-    existing_organization = db.query(Organization).filter(Organization.code == organization.code).first()
-    if existing_organization:
+
+def create_organization_with_admin(
+    db: Session,
+    organization: OrganizationCreate,
+    admin_user: UserCreate
+) -> Tuple[Organization, Optional[User]]:
+    """
+    Create an organization and its admin user in a single transaction.
+    If the admin's email or username is already taken, the organization is
+    still created and no admin user is returned.
+    """
+    existing_organization = db.execute(
+        select(Organization.id).where(Organization.code == organization.code)
+    ).scalar_one_or_none()
+    if existing_organization is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Organization with code '{organization.code}' already exists"
         )
     
     db_organization = Organization(**organization.model_dump())
-    db.add(db_organization)
     try:
-        db.commit()
-        db.refresh(db_organization)
-        return db_organization
+        db.add(db_organization)
+        # Flush to obtain the organization id for the admin's foreign key
+        db.flush()
     except IntegrityError:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Error creating organization. Organization code must be unique."
         )
+    
+    db_admin = None
+    conflict = user_service.find_user_conflict(db, admin_user.email, admin_user.username)
+    if conflict:
+        logger.warning(f"Failed to create admin user for organization {organization.name}: {conflict}")
+    else:
+        db_admin = user_service.build_user(
+            admin_user, admin_user.password, is_active=False, organization_id=db_organization.id
+        )
+        try:
+            # Savepoint: losing a race on the admin's email/username must not undo the organization
+            with db.begin_nested():
+                db.add(db_admin)
+        except IntegrityError:
+            logger.warning(f"Failed to create admin user for organization {organization.name}: email or username taken")
+            db_admin = None
+    
+    db.commit()
+    db.refresh(db_organization)
+    # Nothing cached can refer to a brand-new organization, so the auth cache stays warm
+    return db_organization, db_admin
 
 
 def get_organization(db: Session, organization_id: int) -> Optional[Organization]:
     """Get an organization by ID."""
-    return db.query(Organization).filter(Organization.id == organization_id).first()
+    # Identity-map lookup first; only queries when not already loaded in this session
+    return db.get(Organization, organization_id)
 
 
 def get_organization_by_code(db: Session, code: str) -> Optional[Organization]:
     """Get an organization by code."""
-    return db.query(Organization).filter(Organization.code == code).first()
+    return db.execute(select(Organization).where(Organization.code == code)).scalar_one_or_none()
 
 
 def get_organizations(
@@ -47,31 +85,41 @@ def get_organizations(
     is_active: Optional[bool] = None
 ) -> List[Organization]:
     """Get all organizations with pagination."""
-    query = db.query(Organization)
+    query = select(Organization)
     
     if is_active is not None:
-        query = query.filter(Organization.is_active == is_active)
+        query = query.where(Organization.is_active == is_active)
     
-    return query.offset(skip).limit(limit).all()
+    return list(db.execute(query.offset(skip).limit(limit)).scalars())
 
 
 def update_organization(db: Session, organization_id: int, organization_update: OrganizationUpdate) -> Organization:
     """Update an organization."""
-    db_organization = get_organization(db, organization_id)
-    if not db_organization:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Organization not found"
-        )
-    
     # Update only provided fields
     update_data = organization_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_organization, field, value)
     
     try:
+        if update_data:
+            # UPDATE ... RETURNING modifies and reloads the row in one round trip
+            db_organization = db.execute(
+                update(Organization)
+                .where(Organization.id == organization_id)
+                .values(**update_data)
+                .returning(Organization)
+            ).scalar_one_or_none()
+        else:
+            db_organization = get_organization(db, organization_id)
+        
+        if not db_organization:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Organization not found"
+            )
+        
+        # Keep the RETURNING values; commit would otherwise expire them and force a reload
+        db.expunge(db_organization)
         db.commit()
-        db.refresh(db_organization)
+        auth_cache.clear()
         return db_organization
     except IntegrityError:
         db.rollback()
@@ -83,20 +131,29 @@ def update_organization(db: Session, organization_id: int, organization_update:
 
 def delete_organization(db: Session, organization_id: int) -> bool:
     """Delete an organization (soft delete by setting is_active to False)."""
-    db_organization = get_organization(db, organization_id)
-    if not db_organization:
+    # Soft delete in one statement; no row returned means no such organization
+    deleted_id = db.execute(
+        update(Organization)
+        .where(Organization.id == organization_id)
+        .values(is_active=False)
+        .returning(Organization.id)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    if deleted_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Organization not found"
         )
     
-    # Soft delete
-    db_organization.is_active = False
     db.commit()
+    auth_cache.clear()
     return True
 
 
 def get_organization_users_count(db: Session, organization_id: int) -> int:
     """Get count of users in an organization."""
-    from app.models.user import User
-    return db.query(User).filter(User.organization_id == organization_id).count()
+    # users_count is kept current by a trigger on users, so this is a primary-key lookup
+    count = db.execute(
+        select(Organization.users_count).where(Organization.id == organization_id)
+    ).scalar()
+    return count or 0
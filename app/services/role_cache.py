@@ -0,0 +1,81 @@
+from typing import Any, Dict
+from sqlalchemy import select
+from app.db.session import SessionLocal
+from app.models.role import Role
+from app.utils.auth_cache import add_clear_listener, detached_instance, snapshot
+import threading
+import time
+
+# Roles are seeded once and rarely change; refresh the cache at most this often
+ROLE_CACHE_TTL_SECONDS = 60
+
+_roles_by_id: Dict[int, Dict[str, Any]] = {}
+_role_ids_by_name: Dict[str, int] = {}
+_refresh_at = 0.0
+_lock = threading.Lock()
+# Held while reloading, so only one thread at a time checks out a connection for it
+_reload_lock = threading.Lock()
+
+
+def load_roles() -> None:
+    """Load the whole roles table (a handful of rows) into the process-local cache."""
+    global _roles_by_id, _role_ids_by_name, _refresh_at
+    db = SessionLocal()
+    try:
+        roles = [snapshot(role) for role in db.execute(select(Role)).scalars()]
+    finally:
+        db.close()
+    with _lock:
+        _roles_by_id = {role["id"]: role for role in roles}
+        _role_ids_by_name = {role["name"]: role["id"] for role in roles}
+        _refresh_at = time.monotonic() + ROLE_CACHE_TTL_SECONDS
+
+
+def _ensure_fresh() -> None:
+    """
+    Reload stale roles single-flight: one thread reloads while the others keep serving
+    the previous snapshot. Only a cold cache makes callers wait for the reload.
+    """
+    if time.monotonic() < _refresh_at:
+        return
+    if not _reload_lock.acquire(blocking=not _roles_by_id):
+        return
+    try:
+        # Another thread may have reloaded while this one waited for the lock
+        if time.monotonic() >= _refresh_at:
+            load_roles()
+    finally:
+        _reload_lock.release()
+
+
+def get_role_id(name: str) -> int | None:
+    """Get a role id by name from the process-local cache."""
+    _ensure_fresh()
+    return _role_ids_by_name.get(name)
+
+
+def get_role_name(role_id: int) -> str | None:
+    """Get a role name by id from the process-local cache."""
+    _ensure_fresh()
+    role = _roles_by_id.get(role_id)
+    return role["name"] if role else None
+
+
+def get_role(role_id: int) -> Role | None:
+    """
+    Get a role by id from the process-local cache.
+    Each call returns a new detached instance, so callers may attach it to their own session.
+    """
+    _ensure_fresh()
+    role = _roles_by_id.get(role_id)
+    return detached_instance(Role, role) if role else None
+
+
+def invalidate_role_cache() -> None:
+    """Drop cached roles; call after roles are created, updated or deleted."""
+    global _refresh_at
+    _refresh_at = 0.0
+
+
+# Role mutations clear the auth cache, so a broadcast clear also refreshes roles in other processes
+add_clear_listener(invalidate_role_cache)
@@ -1,13 +1,17 @@
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from app.models.role import Role
+from app.models.user import User
 from app.schemas.role import RoleCreate, RoleUpdate
 from fastapi import HTTPException, status
+from app.services.role_cache import invalidate_role_cache
+from app.utils import auth_cache
 
 
 def create_role(db: Session, role: RoleCreate) -> Role:
     """Create a new role."""
     # Check if role already exists
-    existing_role = db.query(Role).filter(Role.name == role.name).first()
+    existing_role = db.execute(select(Role.id).where(Role.name == role.name)).scalar()
     if existing_role:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -18,17 +22,19 @@ def create_role(db: Session, role: RoleCreate) -> Role:
     db.add(db_role)
     db.commit()
     db.refresh(db_role)
+    invalidate_role_cache()
     return db_role
 
 
 def get_roles(db: Session, skip: int = 0, limit: int = 100):
     """Get all roles."""
-    return db.query(Role).offset(skip).limit(limit).all()
+    return list(db.execute(select(Role).offset(skip).limit(limit)).scalars())
 
 
 def get_role_by_id(db: Session, role_id: int) -> Role:
     """Get role by ID."""
-    role = db.query(Role).filter(Role.id == role_id).first()
+    # Identity-map lookup first; only queries when not already loaded in this session
+    role = db.get(Role, role_id)
     if not role:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -39,14 +45,25 @@ def get_role_by_id(db: Session, role_id: int) -> Role:
 
 def update_role(db: Session, role_id: int, role_update: RoleUpdate) -> Role:
     """Update role."""
-    db_role = get_role_by_id(db, role_id)
-    
     update_data = role_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_role, field, value)
+    if not update_data:
+        return get_role_by_id(db, role_id)
+    
+    # UPDATE ... RETURNING modifies and reloads the row in one round trip
+    db_role = db.execute(
+        update(Role).where(Role.id == role_id).values(**update_data).returning(Role)
+    ).scalar_one_or_none()
+    if not db_role:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Role not found"
+        )
     
+    # Keep the RETURNING values; commit would otherwise expire them and force a reload
+    db.expunge(db_role)
     db.commit()
-    db.refresh(db_role)
+    invalidate_role_cache()
+    auth_cache.clear()
     return db_role
 
 
@@ -54,8 +71,11 @@ def delete_role(db: Session, role_id: int):
     """Delete role."""
     db_role = get_role_by_id(db, role_id)
     
-    # Check if role is in use
-    if db_role.users:
+    # Check if role is in use (EXISTS instead of loading the users collection)
+    role_in_use = db.execute(
+        select(select(User.id).where(User.role_id == role_id).exists())
+    ).scalar()
+    if role_in_use:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot delete role that is assigned to users"
@@ -63,4 +83,6 @@ def delete_role(db: Session, role_id: int):
     
     db.delete(db_role)
     db.commit()
+    invalidate_role_cache()
+    auth_cache.clear()
     return {"message": "Role deleted successfully"}
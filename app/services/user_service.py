@@ -1,35 +1,60 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, or_, select, update
+from sqlalchemy.orm import Session, joinedload
+from app.models.organization import Organization
+from app.models.role import Role
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
+from app.schemas.user import UserCreate, UserResponse, UserUpdate
 from app.utils.security import get_password_hash, generate_random_password
+from app.services.role_cache import get_role_name
+from app.utils import auth_cache
 from fastapi import HTTPException, status
+from typing import List
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def find_user_conflict(db: Session, email: str, username: str) -> str | None:
+    """Return why a user with this email/username can't be created, or None if both are free."""
+    # Check email and username in one round trip; at most one row can match each
+    existing = db.execute(
+        select(User.email, User.username)
+        .where(or_(User.email == email, User.username == username))
+        .limit(2)
+    ).all()
+    if any(row.email == email for row in existing):
+        return "Email already registered"
+    if existing:
+        return "Username already taken"
+    return None
+
+
+def build_user(user: UserCreate, password: str, is_active: bool, organization_id: int | None) -> User:
+    """Build a new, unsaved User with a hashed password."""
+    return User(
+        email=user.email,
+        username=user.username,
+        full_name=user.full_name,
+        hashed_password=get_password_hash(password),
+        role_id=user.role_id,
+        organization_id=organization_id,
+        is_active=is_active
+    )
+
+
 def create_user(db: Session, user: UserCreate, auto_generate_password: bool = False, created_by_admin: bool = False) -> User:
     """Create a new user. Optionally auto-generate password and activate if created by admin."""
-    # Check if email already exists
-    existing_user = db.query(User).filter(User.email == user.email).first()
-    if existing_user:
+    conflict = find_user_conflict(db, user.email, user.username)
+    if conflict:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
-    # Check if username already exists
-    existing_username = db.query(User).filter(User.username == user.username).first()
-    if existing_username:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already taken"
+            detail=conflict
         )
     
     # Validate organization_id for non-system_admin users
-    from app.models.role import Role
-    role = db.query(Role).filter(Role.id == user.role_id).first()
-    if role and role.name != "system_admin" and not user.organization_id:
+    # The role name comes from the in-process role cache; no query needed
+    role_name = get_role_name(user.role_id)
+    if role_name and role_name != "system_admin" and not user.organization_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Organization ID is required for non-system admin users"
@@ -41,44 +66,45 @@ def create_user(db: Session, user: UserCreate, auto_generate_password: bool = Fa
         password = generate_random_password()
     # Always activate if created by admin
     is_active = True if created_by_admin else False
-    db_user = User(
-        email=user.email,
-        username=user.username,
-        full_name=user.full_name,
-        hashed_password=get_password_hash(password),
-        role_id=user.role_id,
-        organization_id=user.organization_id,
-        is_active=is_active
-    )
+    db_user = build_user(user, password, is_active, user.organization_id)
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
     db_user.generated_password = password if auto_generate_password or not user.password else None
-    # Send account created email if created by admin
+    # Send account created email if created by admin; queued so SMTP stays off the request path
     if created_by_admin:
-        try:
-            from app.services.email_service import email_service
-            if db_user.generated_password:
-                email_service.send_user_created_email(
-                    user_email=db_user.email,
-                    user_name=db_user.full_name,
-                    username=db_user.username,
-                    temporary_password=db_user.generated_password
-                )
-            else:
-                email_service.send_user_activation_email(
-                    user_email=db_user.email,
-                    user_name=db_user.full_name,
-                    username=db_user.username
-                )
-        except Exception as e:
-            logger.error(f"Error sending account created email: {e}")
+        from app.services.email_service import email_service
+        if db_user.generated_password:
+            email_service.submit(
+                email_service.send_user_created_email,
+                user_email=db_user.email,
+                user_name=db_user.full_name,
+                username=db_user.username,
+                temporary_password=db_user.generated_password
+            )
+        else:
+            email_service.submit(
+                email_service.send_user_activation_email,
+                user_email=db_user.email,
+                user_name=db_user.full_name,
+                username=db_user.username
+            )
     return db_user
 
 
-def get_user_by_id(db: Session, user_id: int) -> User:
-    """Get user by ID."""
-    user = db.query(User).filter(User.id == user_id).first()
+def get_user_by_id(db: Session, user_id: int, populate_existing: bool = False) -> User:
+    """
+    Get user by ID.
+    Served from the session identity map when the user is already loaded in this request
+    (e.g. the authenticated user); pass populate_existing to force a reload from the database.
+    """
+    # On a miss, joinedload fetches role and organization in the same round trip
+    user = db.get(
+        User,
+        user_id,
+        options=[joinedload(User.role), joinedload(User.organization)],
+        populate_existing=populate_existing
+    )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -89,50 +115,117 @@ def get_user_by_id(db: Session, user_id: int) -> User:
 
 def get_user_by_email(db: Session, email: str) -> User | None:
     """Get user by email."""
-    return db.query(User).filter(User.email == email).first()
+    return db.execute(
+        select(User)
+        .options(joinedload(User.role), joinedload(User.organization))
+        .where(User.email == email)
+    ).scalar_one_or_none()
 
 
-def get_users(db: Session, skip: int = 0, limit: int = 100, organization_id: int = None):
-    """Get all users, optionally filtered by organization."""
-    query = db.query(User)
+def visible_users_query(current_user: User) -> Select:
+    """
+    Build a users query restricted to the rows current_user may see.
+    - System admins see all users
+    - Organization admins see users from their organization
+    - Everyone else sees only themselves
+    """
+    query = select(User)
+    role_name = current_user.role.name
+    
+    if role_name == "system_admin":
+        return query
+    if role_name == "school_admin":
+        return query.where(User.organization_id == current_user.organization_id)
+    return query.where(User.id == current_user.id)
+
+
+# Columns UserResponse reads from users; hashed_password is never fetched for listings
+USER_RESPONSE_COLUMNS = (
+    User.id,
+    User.email,
+    User.username,
+    User.full_name,
+    User.is_active,
+    User.is_verified,
+    User.role_id,
+    User.organization_id,
+    User.created_at,
+    User.updated_at,
+)
+
+
+def list_users_projected(
+    db: Session, current_user: User, skip: int = 0, limit: int = 100, organization_id: int = None
+) -> List[UserResponse]:
+    """List users visible to current_user, fetching only the columns UserResponse needs."""
+    query = visible_users_query(current_user).with_only_columns(*USER_RESPONSE_COLUMNS)
     
     if organization_id is not None:
-        query = query.filter(User.organization_id == organization_id)
+        query = query.where(User.organization_id == organization_id)
     
-    return query.offset(skip).limit(limit).all()
+    rows = db.execute(query.offset(skip).limit(limit)).all()
+    
+    # Fetch each distinct role/organization once rather than joining a copy onto every user row
+    role_ids = {row.role_id for row in rows}
+    organization_ids = {row.organization_id for row in rows if row.organization_id is not None}
+    roles = {
+        role.id: role
+        for role in db.execute(select(Role).where(Role.id.in_(role_ids))).scalars()
+    } if role_ids else {}
+    organizations = {
+        organization.id: organization
+        for organization in db.execute(
+            select(Organization).where(Organization.id.in_(organization_ids))
+        ).scalars()
+    } if organization_ids else {}
+    
+    return [
+        UserResponse.model_validate({
+            **row._asdict(),
+            "role": roles[row.role_id],
+            "organization": organizations.get(row.organization_id)
+        })
+        for row in rows
+    ]
 
 
 def update_user(db: Session, user_id: int, user_update: UserUpdate) -> User:
     """Update user and send activation email if user is being activated."""
-    db_user = get_user_by_id(db, user_id)
+    # Only the previous active flag is needed before writing
+    was_active = db.execute(select(User.is_active).where(User.id == user_id)).scalar_one_or_none()
+    if was_active is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
     
     # Track if user is being activated (was inactive, now active)
-    was_inactive = not db_user.is_active
-    being_activated = user_update.is_active is True and was_inactive
+    being_activated = user_update.is_active is True and not was_active
     
     update_data = user_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_user, field, value)
+    if update_data:
+        # One UPDATE statement instead of per-attribute change tracking on a loaded instance
+        db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(**update_data)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        auth_cache.invalidate_user(user_id)
     
-    db.commit()
-    db.refresh(db_user)
+    # Reload with role and organization in one query; role_id or organization_id may have changed
+    db_user = get_user_by_id(db, user_id, populate_existing=True)
     
-    # Send activation email if user was just activated
+    # Send activation email if user was just activated; queued, so email failures never fail the update
     if being_activated:
-        try:
-            from app.services.email_service import email_service
-            email_sent = email_service.send_user_activation_email(
-                user_email=db_user.email,
-                user_name=db_user.full_name,
-                username=db_user.username
-            )
-            if email_sent:
-                logger.info(f"Activation email sent to {db_user.email}")
-            else:
-                logger.warning(f"Failed to send activation email to {db_user.email}")
-        except Exception as e:
-            # Don't fail the user update if email fails
-            logger.error(f"Error sending activation email: {e}")
+        from app.services.email_service import email_service
+        email_service.submit(
+            email_service.send_user_activation_email,
+            user_email=db_user.email,
+            user_name=db_user.full_name,
+            username=db_user.username
+        )
     
     return db_user
 
@@ -142,4 +235,5 @@ def delete_user(db: Session, user_id: int):
     db_user = get_user_by_id(db, user_id)
     db.delete(db_user)
     db.commit()
+    auth_cache.invalidate_user(user_id)
     return {"message": "User deleted successfully"}
@@ -0,0 +1,278 @@
+"""
+In-process caches for the authentication path: verified JWT payloads, authenticated
+users by access-token jti, and tokens this process has revoked.
+
+Postgres is the source of truth. A cache miss always validates the session against the
+database, so every entry here is only a shortcut, kept for at most AUTH_CACHE_TTL_SECONDS.
+
+The caches are per process. When the service runs as several processes (uvicorn
+--workers N, several replicas), set AUTH_CACHE_REDIS_URL: revocations and invalidations
+are then broadcast over Redis pub/sub and applied by every process as they happen.
+Without it, other processes keep serving a logged-out, deactivated or changed user
+from their cache until the entry expires.
+"""
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+from cachetools import TTLCache
+try:
+    import redis
+except ImportError:  # Only needed when AUTH_CACHE_REDIS_URL is set
+    redis = None
+from sqlalchemy import inspect
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.session import make_transient_to_detached
+from app.models.organization import Organization
+from app.models.role import Role
+from app.models.user import User
+from app.db.session import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Short enough that admin-side changes not explicitly invalidated still propagate quickly
+AUTH_CACHE_TTL_SECONDS = 30
+BROADCAST_CHANNEL = "auth_cache:invalidate"
+
+
+class CachedUser(NamedTuple):
+    """Column snapshot of an authenticated user, keyed by access-token jti."""
+    user: Dict[str, Any]
+    role: Dict[str, Any]
+    organization: Optional[Dict[str, Any]]
+    # Epoch seconds, so the per-request expiry check is a float comparison against time.time()
+    session_expires_at: float
+
+
+_cache: TTLCache = TTLCache(maxsize=10000, ttl=AUTH_CACHE_TTL_SECONDS)
+# Verified JWT payloads keyed by a digest of the raw token, so repeats skip signature checks
+_payloads: TTLCache = TTLCache(maxsize=10000, ttl=AUTH_CACHE_TTL_SECONDS)
+# Tokens revoked by this process (or broadcast to it); an access token is useless after it
+# expires anyway. Best-effort only: lost on restart and evicted beyond maxsize, which merely
+# sends the token back to the database check, where its revoked session is rejected.
+_revoked: TTLCache = TTLCache(maxsize=10000, ttl=get_settings().access_token_expire_minutes * 60)
+# Bumped by every revocation and invalidation, so a user loaded from the database before
+# one of them is not cached after it (see cache_user)
+_generation = 0
+_lock = threading.Lock()
+
+# Cross-process invalidation; both stay None unless start_broadcast() connected to Redis
+_redis = None
+_subscriber = None
+# Identifies this process's messages so it doesn't re-apply its own broadcasts
+_ORIGIN = uuid.uuid4().hex
+# Called after every clear(), local or broadcast, e.g. to drop the role cache too
+_clear_listeners: List[Callable[[], None]] = []
+
+
+def snapshot(obj) -> Dict[str, Any]:
+    """Copy the loaded column values of an ORM instance."""
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+
+def detached_instance(model, values: Dict[str, Any]):
+    """Build a clean, detached instance from a snapshot without touching the database."""
+    obj = inspect(model).class_manager.new_instance()
+    for key, value in values.items():
+        set_committed_value(obj, key, value)
+    make_transient_to_detached(obj)
+    return obj
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def cache_payload(token: str, payload: Dict[str, Any]) -> None:
+    """Remember the verified payload of a raw token. Callers must treat it as read-only."""
+    with _lock:
+        _payloads[_token_key(token)] = payload
+
+
+def get_cached_payload(token: str) -> Optional[Dict[str, Any]]:
+    """Return the verified payload for a raw token, or None if unknown or past its exp claim."""
+    key = _token_key(token)
+    with _lock:
+        payload = _payloads.get(key)
+        if payload is not None and payload.get("exp", 0) <= time.time():
+            _payloads.pop(key, None)
+            return None
+    return payload
+
+
+def current_generation() -> int:
+    """Invalidation counter to read before loading a user from the database."""
+    return _generation
+
+
+def cache_user(jti: str, user: User, session_expires_at: datetime, generation: int) -> None:
+    """
+    Remember an authenticated user (with role and organization) for this token.
+    Skipped if anything was revoked or invalidated since generation was read, since the
+    user may have been loaded before that change.
+    """
+    entry = CachedUser(
+        user=snapshot(user),
+        role=snapshot(user.role),
+        organization=snapshot(user.organization) if user.organization else None,
+        session_expires_at=session_expires_at.timestamp()
+    )
+    with _lock:
+        if generation == _generation:
+            _cache[jti] = entry
+
+
+def get_cached_user(jti: str) -> Optional[User]:
+    """
+    Return the cached user for a token, or None.
+    Entries never outlive the session they were validated against.
+    The user is a detached snapshot, deliberately kept out of the request's session so
+    that service reads (db.get and friends) always see database rows; code that needs
+    to modify the user must load it through the session first.
+    """
+    with _lock:
+        entry = _cache.get(jti)
+    if entry is None:
+        return None
+    if entry.session_expires_at < time.time():
+        invalidate_token(jti)
+        return None
+
+    user = detached_instance(User, entry.user)
+    set_committed_value(user, "role", detached_instance(Role, entry.role))
+    set_committed_value(
+        user,
+        "organization",
+        detached_instance(Organization, entry.organization) if entry.organization else None
+    )
+    return user
+
+
+def invalidate_token(jti: str) -> None:
+    """Forget a single expired token in this process; revocations go through revoke_tokens."""
+    with _lock:
+        _cache.pop(jti, None)
+
+
+def _revoke_local(jtis) -> None:
+    global _generation
+    with _lock:
+        _generation += 1
+        for jti in jtis:
+            _cache.pop(jti, None)
+            _revoked[jti] = True
+
+
+def revoke_tokens(jtis) -> None:
+    """
+    Forget and reject the given tokens without a database lookup, e.g. on logout or password change.
+    Broadcast to the other processes when Redis is configured.
+    """
+    jtis = list(jtis)
+    if not jtis:
+        return
+    _revoke_local(jtis)
+    _publish({"op": "revoke", "jtis": jtis})
+
+
+def is_revoked(jti: str) -> bool:
+    """Whether this process knows the token is revoked; False means ask the database."""
+    with _lock:
+        return jti in _revoked
+
+
+def _invalidate_user_local(user_id: int) -> None:
+    global _generation
+    with _lock:
+        _generation += 1
+        for jti in [jti for jti, entry in _cache.items() if entry.user["id"] == user_id]:
+            _cache.pop(jti, None)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Forget every token of a user, e.g. after a password change or account update."""
+    _invalidate_user_local(user_id)
+    _publish({"op": "invalidate_user", "user_id": user_id})
+
+
+def _clear_local() -> None:
+    global _generation
+    with _lock:
+        _generation += 1
+        _cache.clear()
+    for listener in _clear_listeners:
+        listener()
+
+
+def clear() -> None:
+    """Forget all cached users, e.g. after a role or organization mutation. Revocations are kept."""
+    _clear_local()
+    _publish({"op": "clear"})
+
+
+def add_clear_listener(listener: Callable[[], None]) -> None:
+    """Run listener whenever the user cache is cleared, in this or (via broadcast) another process."""
+    _clear_listeners.append(listener)
+
+
+def _publish(message: Dict[str, Any]) -> None:
+    """Broadcast an invalidation; failures only cost other processes their shortcut, never correctness."""
+    if _redis is None:
+        return
+    try:
+        _redis.publish(BROADCAST_CHANNEL, json.dumps({**message, "origin": _ORIGIN}))
+    except redis.RedisError as e:
+        logger.warning("Could not broadcast auth cache invalidation: %s", e)
+
+
+def _on_message(message: Dict[str, Any]) -> None:
+    data = json.loads(message["data"])
+    if data.get("origin") == _ORIGIN:
+        return
+    op = data.get("op")
+    if op == "revoke":
+        _revoke_local(data["jtis"])
+    elif op == "invalidate_user":
+        _invalidate_user_local(data["user_id"])
+    elif op == "clear":
+        _clear_local()
+
+
+def _on_subscriber_error(error: Exception, pubsub, thread) -> None:
+    # Messages may have been missed while disconnected; drop everything rather than trust it
+    logger.warning("Auth cache broadcast connection lost, clearing local cache: %s", error)
+    _clear_local()
+    time.sleep(1)
+
+
+def start_broadcast() -> None:
+    """Subscribe to cross-process invalidations if AUTH_CACHE_REDIS_URL is set; call once at startup."""
+    global _redis, _subscriber
+    url = get_settings().auth_cache_redis_url
+    if not url or _redis is not None:
+        return
+    if redis is None:
+        raise RuntimeError("AUTH_CACHE_REDIS_URL is set but the redis package is not installed")
+    client = redis.Redis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+    pubsub = client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(**{BROADCAST_CHANNEL: _on_message})
+    _subscriber = pubsub.run_in_thread(
+        sleep_time=1, daemon=True, exception_handler=_on_subscriber_error
+    )
+    _redis = client
+    logger.info("Auth cache invalidations are broadcast over Redis")
+
+
+def stop_broadcast() -> None:
+    """Stop the subscriber thread and close the Redis connection."""
+    global _redis, _subscriber
+    if _subscriber is not None:
+        _subscriber.stop()
+        _subscriber = None
+    if _redis is not None:
+        _redis.close()
+        _redis = None
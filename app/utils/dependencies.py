@@ -1,143 +1,192 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload, lazyload
+from sqlalchemy.orm.attributes import set_committed_value
 from app.db.session import get_db
 from app.models.user import User
 from app.models.session import Session as UserSession
-from app.utils.security import decode_token
-from datetime import datetime, timezone
+from app.utils.security import decode_access_token
+from app.services.role_cache import get_role, get_role_id, get_role_name
+from app.utils import auth_cache
+import logging
+
+logger = logging.getLogger(__name__)
 
 security = HTTPBearer()
 
+# Role sets for the require_roles guards below
+_ADMIN_ROLES = frozenset({"system_admin", "school_admin"})
+_SYSTEM_ADMIN_ROLES = frozenset({"system_admin"})
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """
-    Get the current authenticated user from JWT token.
-    """
-    credentials_exception = HTTPException(
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def get_token_payload(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> dict:
+    """
+    Verify the bearer token once per request.
+    The payload and jti are kept on request.state for any later consumer.
+    """
+    payload = getattr(request.state, "jwt_payload", None)
+    if payload is not None:
+        return payload
     
-    try:
-        token = credentials.credentials
-        payload = decode_token(token)
-        
-        print(f"🔍 Token payload: {payload}")  # DEBUG
-        
-        # Verify token type
-        if payload.get("type") != "access":
-            print(f"❌ Invalid token type: {payload.get('type')}")  # DEBUG
-            raise credentials_exception
-        
-        # JWT sub is string (per spec); convert to int for user_id (handle legacy int sub)
-        sub = payload.get("sub")
+    token = credentials.credentials
+    # Recently verified tokens skip the signature check; revocation is still checked per jti
+    payload = auth_cache.get_cached_payload(token)
+    if payload is None:
         try:
-            user_id = int(sub) if sub is not None else None
-        except (TypeError, ValueError):
-            user_id = None
-        jti: str = payload.get("jti")
-        
-        print(f"🔍 Extracted - user_id: {user_id}, jti: {jti[:20] if jti else None}...")  # DEBUG
-        
-        if user_id is None or jti is None:
-            print(f"❌ Missing user_id or jti in token")  # DEBUG
-            raise credentials_exception
-            
-    except ValueError as e:
-        print(f"❌ Token decode error: {e}")  # DEBUG
-        raise credentials_exception
+            payload = decode_access_token(token)
+        except ValueError as e:
+            logger.debug("Token decode error: %s", e)
+            raise _credentials_exception()
+        auth_cache.cache_payload(token, payload)
     
-    # Check if session is valid and not revoked
-    session = db.query(UserSession).filter(
-        UserSession.token_jti == jti,
-        UserSession.is_revoked == False
-    ).first()
+    request.state.jwt_payload = payload
+    request.state.jti = payload.get("jti")
+    return payload
+
+
+def get_current_user(
+    request: Request,
+    payload: dict = Depends(get_token_payload),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Get the current authenticated user from JWT token.
+    Declared sync so FastAPI runs its blocking DB queries in the threadpool.
+    The user is kept on request.state, so any later resolution in the same request is free.
+    """
+    user = getattr(request.state, "current_user", None)
+    if user is not None:
+        return user
     
-    print(f"🔍 Session lookup for jti {jti[:20]}... -> Found: {session is not None}")  # DEBUG
+    # Verify token type
+    if payload.get("type") != "access":
+        logger.debug("Invalid token type: %s", payload.get("type"))
+        raise _credentials_exception()
     
-    if not session:
-        print(f"❌ No valid session found for jti")  # DEBUG
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Session has been revoked or expired"
-        )
+    # JWT sub is string (per spec); convert to int for user_id (handle legacy int sub)
+    sub = payload.get("sub")
+    try:
+        user_id = int(sub) if sub is not None else None
+    except (TypeError, ValueError):
+        user_id = None
+    jti: str = payload.get("jti")
+    
+    if user_id is None or jti is None:
+        logger.debug("Missing user_id or jti in token")
+        raise _credentials_exception()
     
-    # Check if session is expired (use UTC-aware now; DB stores timezone-aware)
-    if session.expires_at < datetime.now(timezone.utc):
+    if auth_cache.is_revoked(jti):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has expired"
+            detail="Session has been revoked or expired"
         )
     
-    # Get user
-    user = db.query(User).filter(User.id == user_id).first()
-    
+    # Recently validated tokens skip the session and user queries
+    user = auth_cache.get_cached_user(jti)
     if user is None:
-        raise credentials_exception
+        generation = auth_cache.current_generation()
+        # Validate the session and load its user in one round trip; revoked and
+        # expired sessions are filtered by the database against its own clock
+        row = db.execute(
+            select(User, UserSession.expires_at)
+            .join(UserSession, UserSession.user_id == User.id)
+            .options(lazyload(User.role), joinedload(User.organization))
+            .where(
+                UserSession.token_jti == jti,
+                UserSession.is_revoked == False,
+                UserSession.expires_at > func.now(),
+                User.id == user_id
+            )
+        ).first()
+        
+        if row is None:
+            logger.debug("No valid session found for jti %.20s...", jti)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Session has been revoked or expired"
+            )
+        user, session_expires_at = row
+        
+        role = get_role(user.role_id)
+        if role is not None:
+            set_committed_value(user, "role", role)
     
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User account is inactive"
-        )
+        if not user.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="User account is inactive"
+            )
+        
+        auth_cache.cache_user(jti, user, session_expires_at, generation)
+    
+    # Cache authorization facts for downstream handlers and guards
+    # One role-cache lookup by id; no need to touch user.role
+    role_name = get_role_name(user.role_id)
+    request.state.role_name = role_name
+    request.state.is_system_admin = role_name == "system_admin"
+    request.state.is_admin = role_name in _ADMIN_ROLES
+    request.state.org_id = user.organization_id
+    request.state.current_user = user
     
     return user
 
 
-async def get_current_active_user(
+def get_current_jti(
+    request: Request,
     current_user: User = Depends(get_current_user)
-) -> User:
-    """Get current active user."""
-    if not current_user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Inactive user"
-        )
-    return current_user
+) -> str:
+    """Get the jti of the validated access token for the current request."""
+    return request.state.jti
 
 
-async def get_current_admin_user(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current user and verify admin role (backward compatibility)."""
-    if current_user.role.name not in ["system_admin", "school_admin"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
-    return current_user
+# Role guards build on get_current_user through Depends() only, so FastAPI
+# resolves it once per request and a 401 from it short-circuits every guard.
 
+# get_current_user already rejects inactive users; kept as an alias for existing imports
+get_current_active_user = get_current_user
 
-async def get_system_admin_user(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current user and verify system admin role."""
-    if current_user.role.name != "system_admin":
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only system administrators can perform this action"
-        )
-    return current_user
 
+def require_roles(roles: frozenset, detail: str):
+    """Build a guard dependency that returns the current user if their role is in roles, else 403."""
+    async def guard(
+        request: Request,
+        current_user: User = Depends(get_current_user)
+    ) -> User:
+        if request.state.role_name not in roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=detail
+            )
+        return current_user
+    return guard
 
-async def get_school_admin_or_higher(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current user and verify school admin or system admin role."""
-    if current_user.role.name not in ["system_admin", "school_admin"]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="This action requires school administrator or higher privileges"
-        )
-    return current_user
+
+# Get current user and verify admin role (backward compatibility)
+get_current_admin_user = require_roles(_ADMIN_ROLES, "Not enough permissions")
+
+# Get current user and verify system admin role
+get_system_admin_user = require_roles(
+    _SYSTEM_ADMIN_ROLES,
+    "Only system administrators can perform this action"
+)
+
+# Get current user and verify school admin or system admin role
+get_school_admin_or_higher = require_roles(
+    _ADMIN_ROLES,
+    "This action requires school administrator or higher privileges"
+)
 
 
 def verify_school_access(current_user: User, target_school_id: int) -> bool:
@@ -146,7 +195,7 @@ def verify_school_access(current_user: User, target_school_id: int) -> bool:
     System admins have access to all organizations.
     Other users only have access to their own organization.
     """
-    if current_user.role.name == "system_admin":
+    if current_user.role_id == get_role_id("system_admin"):
         return True
     
     return current_user.organization_id == target_school_id
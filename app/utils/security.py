@@ -1,26 +1,84 @@
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
+from functools import lru_cache
 from typing import Any, Dict
 from jose import JWTError, jwt
+from jose.utils import base64url_encode
 from passlib.context import CryptContext
-from app.db.session import settings
+from app.db.session import get_settings
+import hashlib
+import hmac
+import json
 import secrets
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+@lru_cache
+def get_pwd_context() -> CryptContext:
+    """
+    Password hashing context, built on first use so importing this module
+    (e.g. from scripts that only mint or check tokens) skips passlib setup.
+    New hashes use argon2id; existing bcrypt hashes still verify and are upgraded on login.
+    """
+    return CryptContext(
+        schemes=["argon2", "bcrypt"],
+        deprecated="auto",
+        argon2__type="ID",
+        argon2__time_cost=settings.argon2_time_cost,
+        argon2__memory_cost=settings.argon2_memory_cost,
+        argon2__parallelism=settings.argon2_parallelism
+    )
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 ALGORITHM = settings.algorithm
 SECRET_KEY = settings.secret_key
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
 REFRESH_TOKEN_EXPIRE_DAYS = settings.refresh_token_expire_days
+# Token lifetimes in seconds; exp claims are integer Unix timestamps, as JWT stores them anyway
+_ACCESS_EXP_SECONDS = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+_REFRESH_EXP_SECONDS = REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+_PASSWORD_RESET_EXP_SECONDS = 60 * 60
+
+# For HMAC algorithms the JWT header and keyed hash are fixed, so build them once and only
+# serialise and sign the claims per token; other algorithms go through jwt.encode
+_HMAC_DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+if ALGORITHM in _HMAC_DIGESTS:
+    _JWT_HEADER = base64url_encode(json.dumps({"alg": ALGORITHM, "typ": "JWT"}, separators=(",", ":")).encode())
+    _JWT_HMAC = hmac.new(SECRET_KEY.encode(), digestmod=_HMAC_DIGESTS[ALGORITHM])
+else:
+    _JWT_HMAC = None
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Verify a password and, if its hash uses a deprecated scheme or parameters, rehash it.
+    Returns: (is_valid, new_hash or None)
+    """
+    return get_pwd_context().verify_and_update(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Hash a password."""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+
+def _encode_jwt(claims: Dict[str, Any]) -> str:
+    """Encode and sign claims; equivalent to jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)."""
+    if _JWT_HMAC is None:
+        return jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+    signing_input = _JWT_HEADER + b"." + base64url_encode(json.dumps(claims, separators=(",", ":")).encode())
+    signature = _JWT_HMAC.copy()
+    signature.update(signing_input)
+    return (signing_input + b"." + base64url_encode(signature.digest())).decode()
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: timedelta | None = None) -> tuple[str, str]:
@@ -29,16 +87,16 @@ def create_access_token(data: Dict[str, Any], expires_delta: timedelta | None =
     Returns: (token, jti)
     """
     to_encode = data.copy()
-    jti = secrets.token_urlsafe(32)
+    jti = secrets.token_hex(16)
     to_encode.update({"jti": jti})
     
     if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
+        expire = int(time.time() + expires_delta.total_seconds())
     else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = int(time.time()) + _ACCESS_EXP_SECONDS
     
     to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = _encode_jwt(to_encode)
     return encoded_jwt, jti
 
 
@@ -48,39 +106,51 @@ def create_refresh_token(data: Dict[str, Any]) -> tuple[str, str]:
     Returns: (token, jti)
     """
     to_encode = data.copy()
-    jti = secrets.token_urlsafe(32)
+    jti = secrets.token_hex(16)
     to_encode.update({"jti": jti})
     
-    expire = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    expire = int(time.time()) + _REFRESH_EXP_SECONDS
     to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = _encode_jwt(to_encode)
     return encoded_jwt, jti
 
 
 def decode_token(token: str) -> Dict[str, Any]:
     """Decode and verify a JWT token."""
     try:
-        print(f"🔐 Attempting to decode token: {token[:50]}...")  # DEBUG
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        print(f"✅ Token decoded successfully: {payload}")  # DEBUG
-        return payload
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError as e:
-        print(f"❌ JWTError during decode: {e}")  # DEBUG
+        logger.debug("JWTError during decode: %s", e)
         raise ValueError(f"Invalid token: {e}")
     except Exception as e:
-        print(f"❌ Unexpected error during decode: {type(e).__name__}: {e}")  # DEBUG
+        logger.debug("Unexpected error during decode: %s: %s", type(e).__name__, e)
         raise ValueError("Invalid token")
 
 
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """
+    Decode and verify an access token.
+    Tokens whose unverified claims are not an access token with sub and jti are
+    rejected before the signature check, so misused refresh or malformed tokens cost no HMAC.
+    """
+    try:
+        claims = jwt.get_unverified_claims(token)
+    except JWTError as e:
+        raise ValueError(f"Invalid token: {e}")
+    if claims.get("type") != "access" or claims.get("sub") is None or claims.get("jti") is None:
+        raise ValueError("Not an access token")
+    return decode_token(token)
+
+
 def create_password_reset_token(email: str) -> str:
     """
     Create a password reset token.
     Returns: token (expires in 1 hour)
     """
     to_encode = {"email": email, "type": "password_reset"}
-    expire = datetime.now(timezone.utc) + timedelta(hours=1)
+    expire = int(time.time()) + _PASSWORD_RESET_EXP_SECONDS
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = _encode_jwt(to_encode)
     return encoded_jwt
 
 
@@ -5,11 +5,33 @@ Run this to diagnose connection issues
 import socket
 import smtplib
 import ssl
+from concurrent.futures import ThreadPoolExecutor
 try:
     import certifi
 except ImportError:
     certifi = None
-from app.db.session import settings
+from app.db.session import get_settings
+
+settings = get_settings()
+
+# Parsing the CA bundle is the slow part of building a context, so both methods share one
+if certifi:
+    _SSL_CONTEXT = ssl.create_default_context(cafile=certifi.where())
+    _SSL_CONTEXT_SOURCE = "certifi certificate bundle"
+else:
+    _SSL_CONTEXT = ssl.create_default_context()
+    _SSL_CONTEXT_SOURCE = "default SSL context"
+
+
+def _probe_port(target):
+    """Try a TCP connection; returns (target, error or None)."""
+    host, port, method = target
+    try:
+        sock = socket.create_connection((host, port), timeout=5)
+        sock.close()
+        return target, None
+    except (socket.timeout, ConnectionRefusedError, OSError) as e:
+        return target, e
 
 
 def test_port_connectivity():
@@ -24,14 +46,17 @@ def test_port_connectivity():
         ("smtp.gmail.com", 25, "Plain")
     ]
     
-    for host, port, method in hosts_ports:
-        try:
-            print(f"\n🔍 Testing {host}:{port} ({method})...", end=" ")
-            sock = socket.create_connection((host, port), timeout=5)
-            sock.close()
+    # Probes are independent, so run them together; worst case is one timeout, not three
+    with ThreadPoolExecutor(max_workers=len(hosts_ports)) as executor:
+        results = list(executor.map(_probe_port, hosts_ports))
+    
+    # Report in the original order
+    for (host, port, method), error in results:
+        print(f"\n🔍 Testing {host}:{port} ({method})...", end=" ")
+        if error is None:
             print(f"✅ Port {port} is reachable")
-        except (socket.timeout, ConnectionRefusedError, OSError) as e:
-            print(f"❌ Port {port} is blocked or unreachable: {e}")
+        else:
+            print(f"❌ Port {port} is blocked or unreachable: {error}")
 
 
 def test_smtp_connection():
@@ -51,18 +76,12 @@ def test_smtp_connection():
     # Test Method 1: STARTTLS (Port 587)
     print("\n📧 Method 1: Testing STARTTLS on port 587...")
     try:
-        # Create SSL context with proper certificate handling
-        if certifi:
-            context = ssl.create_default_context(cafile=certifi.where())
-            print("Using certifi certificate bundle")
-        else:
-            context = ssl.create_default_context()
-            print("Using default SSL context")
+        print(f"Using {_SSL_CONTEXT_SOURCE}")
         
         server = smtplib.SMTP(settings.smtp_host, 587, timeout=30)
         print("Connected to SMTP server")
         
-        server.starttls(context=context)
+        server.starttls(context=_SSL_CONTEXT)
         print("✅ TLS started successfully")
         
         server.login(settings.smtp_user, settings.smtp_password)
@@ -87,15 +106,9 @@ def test_smtp_connection():
     # Test Method 2: SSL (Port 465)
     print("\n📧 Method 2: Testing SSL on port 465...")
     try:
-        # Create SSL context with proper certificate handling
-        if certifi:
-            context = ssl.create_default_context(cafile=certifi.where())
-            print("Using certifi certificate bundle for SSL")
-        else:
-            context = ssl.create_default_context()
-            print("Using default SSL context")
+        print(f"Using {_SSL_CONTEXT_SOURCE} for SSL")
         
-        server = smtplib.SMTP_SSL(settings.smtp_host, 465, timeout=30, context=context)
+        server = smtplib.SMTP_SSL(settings.smtp_host, 465, timeout=30, context=_SSL_CONTEXT)
         print("Connected via SSL")
         
         server.login(settings.smtp_user, settings.smtp_password)
@@ -20,5 +20,7 @@ finally:
 "
 
 # Start the FastAPI application
+# Auth caches are per process: if you add --workers N or run several replicas,
+# set AUTH_CACHE_REDIS_URL so revocations reach every process.
 echo "Starting FastAPI server..."
 uvicorn app.main:app --host 0.0.0.0 --port 8080 --reload
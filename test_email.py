@@ -3,7 +3,9 @@ Test script for Gmail SMTP email functionality
 Run this script to test if email sending is working correctly
 """
 from app.services.email_service import email_service
-from app.db.session import settings
+from app.db.session import get_settings
+
+settings = get_settings()
 
 
 def test_basic_email():